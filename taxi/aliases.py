@@ -1,9 +1,15 @@
 from __future__ import unicode_literals
 
+import bisect
+import codecs
 import collections
 import difflib
+import heapq
+import json
 import six
 
+from .utils.file import write_file_atomically
+
 
 class Mapping(collections.namedtuple('BaseMapping', ['mapping', 'backend'])):
     def is_mapped(self):
@@ -35,7 +41,7 @@ class AliasesDatabase(object):
         self.reset()
 
         if aliases:
-            self.aliases = aliases
+            self.update(aliases)
 
     def __getitem__(self, key):
         """
@@ -45,7 +51,15 @@ class AliasesDatabase(object):
         return self.aliases[key]
 
     def __setitem__(self, key, value):
+        if key in self.aliases:
+            self._unindex(key, self.aliases[key])
+        else:
+            bisect.insort(self._sorted_keys, (key.lower(), key))
+            self._close_matches_index = None
+
         self.aliases[key] = value
+        self._index(key, value)
+        self._reversed_aliases = None
 
     def __contains__(self, key):
         return key in self.aliases
@@ -69,27 +83,145 @@ class AliasesDatabase(object):
         return list(self.aliases.keys())
 
     def update(self, other):
-        self.aliases.update(other)
+        """
+        Add or replace the aliases of the given dict. The sorted indexes are
+        only sorted once, instead of inserting each alias in them.
+        """
+        other = dict(other)
+        new_keys = [(key.lower(), key) for key in other if key not in self.aliases]
+
+        # Existing aliases are unindexed first, while the indexes are still sorted
+        for key in other:
+            if key in self.aliases:
+                self._unindex(key, self.aliases[key])
+
+        for key, value in six.iteritems(other):
+            self.aliases[key] = value
+            self._index(key, value, sort=False)
+
+        if new_keys:
+            self._sorted_keys.extend(new_keys)
+            self._sorted_keys.sort()
+            self._close_matches_index = None
+
+        for backend in set(value.backend for value in six.itervalues(other)):
+            self._sorted_keys_by_backend[backend].sort()
+
+        self._reversed_aliases = None
 
     def reset(self):
         """
         Reset the aliases to an empty state.
         """
         self.aliases = {}
+        # Lists of (lowercased alias, alias) tuples, sorted, for all the
+        # aliases and by backend
+        self._sorted_keys = []
+        self._sorted_keys_by_backend = {}
+        # Project id -> set of aliases mapped to this project
+        self._aliases_by_project = {}
+        self._reversed_aliases = None
+        self._close_matches_index = None
+
+    def _index(self, key, mapping, sort=True):
+        sorted_keys = self._sorted_keys_by_backend.setdefault(mapping.backend, [])
+
+        if sort:
+            bisect.insort(sorted_keys, (key.lower(), key))
+        else:
+            sorted_keys.append((key.lower(), key))
+
+        if mapping.is_mapped():
+            self._aliases_by_project.setdefault(mapping.mapping[0], set()).add(key)
+
+    def _unindex(self, key, mapping):
+        sorted_keys = self._sorted_keys_by_backend[mapping.backend]
+        del sorted_keys[bisect.bisect_left(sorted_keys, (key.lower(), key))]
+
+        if mapping.is_mapped():
+            self._aliases_by_project[mapping.mapping[0]].discard(key)
 
     def get_reversed_aliases(self):
         """
         Return the reversed aliases dict. Instead of being in the form
-        {'alias': mapping}, the dict is in the form {mapping: 'alias'}.
+        {'alias': mapping}, the dict is in the form {mapping: 'alias'}. The
+        dict is cached until the aliases change and must not be modified.
+        """
+        if self._reversed_aliases is None:
+            self._reversed_aliases = dict((v, k) for k, v in six.iteritems(self.aliases))
+
+        return self._reversed_aliases
+
+    def get_close_matches(self, alias, n=3, cutoff=0.2):
+        """
+        Return the aliases that look like the given alias. The results are the
+        same as :func:`difflib.get_close_matches` but the characters index
+        (see :meth:`get_close_matches_index`) is used to only compare the
+        aliases that can be similar enough, the best candidates first.
+        Results are memoized until the aliases change.
         """
-        return dict((v, k) for k, v in six.iteritems(self.aliases))
+        index = self.get_close_matches_index()
+        cache_key = (alias, n, cutoff)
 
-    def get_close_matches(self, alias):
+        if cache_key in index['matches']:
+            return list(index['matches'][cache_key])
+
+        # Count the characters each alias has in common with the given alias,
+        # which gives the same upper bound as SequenceMatcher.quick_ratio
+        nb_common_chars = collections.defaultdict(int)
+        for char, count in six.iteritems(collections.Counter(alias)):
+            for key, key_count in index['chars'].get(char, ()):
+                nb_common_chars[key] += min(count, key_count)
+
+        candidates = []
+        for key, nb_common in six.iteritems(nb_common_chars):
+            upper_bound = 2.0 * nb_common / (len(key) + len(alias))
+
+            if upper_bound >= cutoff:
+                candidates.append((upper_bound, key))
+
+        candidates.sort(reverse=True)
+
+        sequence_matcher = difflib.SequenceMatcher()
+        sequence_matcher.set_seq2(alias)
+        matches = []
+
+        for upper_bound, key in candidates:
+            # The remaining candidates can't beat the current matches
+            if len(matches) >= n and upper_bound < matches[0][0]:
+                break
+
+            sequence_matcher.set_seq1(key)
+            ratio = sequence_matcher.ratio()
+
+            if ratio >= cutoff:
+                if len(matches) < n:
+                    heapq.heappush(matches, (ratio, key))
+                else:
+                    heapq.heappushpop(matches, (ratio, key))
+
+        close_matches = [key for ratio, key in heapq.nlargest(n, matches)]
+        index['matches'][cache_key] = close_matches
+
+        return list(close_matches)
+
+    def get_close_matches_index(self):
         """
-        Return the aliases that look like the given alias.
+        Return the index used by :meth:`get_close_matches`, built on first use
+        and reset when aliases are added or removed. It maps each character to
+        the aliases containing it along with its number of occurrences, and
+        holds the memoized matches.
         """
-        return difflib.get_close_matches(alias,
-                                         self.keys(), cutoff=0.2)
+        if self._close_matches_index is None:
+            chars = collections.defaultdict(list)
+
+            for key in self.aliases:
+                for char, count in six.iteritems(collections.Counter(key)):
+                    chars[char].append((key, count))
+
+            self._close_matches_index = {'chars': dict(chars), 'matches': {}}
+
+        return self._close_matches_index
 
     def filter_from_mapping(self, mapping, backend=None):
         """
@@ -98,39 +230,140 @@ class AliasesDatabase(object):
         that only match the first item of `mapping` (useful to show all
         mappings for a given project).
         """
-        def mapping_filter(key_item):
-            key, item = key_item
+        if mapping is None:
+            keys = self.aliases
+        else:
+            keys = [
+                key for key in self._aliases_by_project.get(mapping[0], ())
+                if mapping[1] is None or self.aliases[key].mapping == mapping
+            ]
 
-            return (
-                (mapping is None or item.mapping == mapping or
-                    (mapping[1] is None and item.mapping is not None and item.mapping[0] == mapping[0])) and
-                (backend is None or item.backend == backend)
-            )
-
-        items = six.moves.filter(mapping_filter, six.iteritems(self))
+        items = [
+            (key, self.aliases[key]) for key in keys
+            if backend is None or self.aliases[key].backend == backend
+        ]
 
         aliases = collections.OrderedDict(
-            sorted(items, key=lambda alias: alias[1].mapping
-                   if alias[1] is not None else (0, 0))
+            sorted(items, key=lambda alias: (get_mapping_sort_key(alias[1]), alias[0]))
         )
 
         return aliases
 
     def filter_from_alias(self, alias, backend=None):
         """
-        Return aliases that start with the given `alias`, optionally filtered
-        by backend.
+        Return aliases that contain the given `alias`, optionally filtered
+        by backend, sorted by alias.
         """
-        def alias_filter(key_item):
-            key, item = key_item
+        if backend is None:
+            sorted_keys = self._sorted_keys
+        else:
+            sorted_keys = self._sorted_keys_by_backend.get(backend, [])
 
-            return ((alias is None or alias in key) and
-                    (backend is None or item.backend == backend))
+        aliases = collections.OrderedDict(
+            (key, self.aliases[key]) for lowercased_key, key in sorted_keys
+            if alias is None or alias in key
+        )
 
-        items = six.moves.filter(alias_filter, six.iteritems(self))
+        return aliases
 
-        aliases = collections.OrderedDict(sorted(items, key=lambda a: a[0].lower()))
 
-        return aliases
+def get_mapping_sort_key(mapping):
+    """
+    Return a key to sort :py:class:`Mapping` objects by project and activity,
+    local aliases and mappings without an activity coming first.
+    """
+    if not mapping.is_mapped():
+        return (0, 0, 0, 0)
+
+    project, activity = mapping.mapping
+
+    return (1, project, 0, 0) if activity is None else (1, project, 1, activity)
+
+
+class SharedAliasesDb(object):
+    """
+    Store of the aliases shared by the backends (see :attr:`taxi.projects.Project.aliases`), which are fetched by the
+    ``update`` command. The aliases are stored in the JSON file `path`, indexed by backend and alias, instead of in the
+    configuration file, so that the configuration file only contains the user-defined aliases.
+    """
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._aliases = None
+
+    def get_aliases(self):
+        """
+        Return a dict {backend: {alias: mapping}} of the shared aliases. The file is read on first call.
+        """
+        if self._aliases is None:
+            self._aliases = self.load()
+
+        return self._aliases
+
+    def load(self):
+        try:
+            with codecs.open(self.path, 'r', 'utf-8') as shared_aliases_file:
+                contents = json.loads(shared_aliases_file.read())
+        except (IOError, OSError, ValueError):
+            return {}
+
+        if not isinstance(contents, dict) or contents.get('VERSION') != self.VERSION:
+            return {}
+
+        return dict(
+            (backend, dict(
+                (alias, Mapping(tuple(mapping) if mapping is not None else None, backend))
+                for alias, mapping in six.iteritems(aliases)
+            ))
+            for backend, aliases in six.iteritems(contents['aliases'])
+        )
+
+    def save(self, aliases):
+        write_file_atomically(self.path, json.dumps({
+            'VERSION': self.VERSION,
+            'aliases': dict(
+                (backend, dict(
+                    (alias, list(mapping.mapping) if mapping.is_mapped() else None)
+                    for alias, mapping in six.iteritems(backend_aliases)
+                ))
+                for backend, backend_aliases in six.iteritems(aliases)
+            )
+        }, sort_keys=True))
+
+        self._aliases = aliases
+
+    def update(self, backends_aliases):
+        """
+        Replace the shared aliases of the backends given in the {backend: {alias: mapping}} `backends_aliases` dict.
+        The file is only written if the aliases changed. Return `True` if the aliases changed.
+        """
+        aliases = dict(self.get_aliases())
+        aliases.update(backends_aliases)
+
+        if aliases == self.get_aliases():
+            return False
+
+        self.save(aliases)
+
+        return True
+
+    def remove_aliases(self, aliases):
+        """
+        Remove the given list of `(alias, mapping)` tuples from the shared aliases.
+        """
+        backends_aliases = {}
+
+        for alias, mapping in aliases:
+            backend_aliases = backends_aliases.get(mapping.backend, self.get_aliases().get(mapping.backend, {}))
+
+            if alias in backend_aliases:
+                backends_aliases[mapping.backend] = dict(
+                    (key, value) for key, value in six.iteritems(backend_aliases) if key != alias
+                )
+
+        if backends_aliases:
+            self.update(backends_aliases)
+
 
 aliases_database = AliasesDatabase()
@@ -15,7 +15,13 @@ class BaseBackend(object):
     The :class:`~taxi.plugins.PluginsRegistry` takes care of the
     parsing and the instanciation of the backend objects. The `options`
     parameter is a dictionary constructed from the backend URL querystring.
+
+    Backends that can push several entries in a single request should
+    implement :meth:`push_entries` and set :attr:`push_batch_size` to the
+    maximum number of entries to push at once.
     """
+    push_batch_size = 1
+
     def __init__(self, username, password, hostname, port, path, options):
         """
         Construct the backend.
@@ -38,14 +44,57 @@ class BaseBackend(object):
         """
         pass
 
-    def get_projects(self):
+    def push_entries(self, entries):
+        """
+        Called when a batch of entries should be pushed to the backend.
+        `entries` is a list of `(date, entry)` tuples, as passed to
+        :meth:`push_entry`. The maximum size of the batches is defined by the
+        :attr:`push_batch_size` attribute. The default implementation calls
+        :meth:`push_entry` for each entry.
+
+        If some entries couldn't be pushed, this method should raise a
+        :class:`PushEntriesFailed` exception with ``entries`` being a
+        dictionary containing the failed entries as keys, and error messages
+        as values. Any other exception will mark all the entries of the batch
+        as failed.
+        """
+        failed_entries = {}
+
+        for date, entry in entries:
+            try:
+                self.push_entry(date, entry)
+            except Exception as e:
+                failed_entries[entry] = six.text_type(e)
+
+        if failed_entries:
+            raise PushEntriesFailed(entries=failed_entries)
+
+    def get_projects(self, since=None):
         """
         Return a list of projects and activities. These will be then stored for
         further use. The list should contain :class:`~taxi.projects.Project`
         objects.
+
+        If the backend supports incremental updates (see
+        :meth:`get_projects_sync_token`), `since` is set to the sync token
+        of the previous update and only the projects that were added or
+        modified since then should be returned. Deleted projects should be
+        returned with their status set to
+        :attr:`~taxi.projects.Project.STATUS_DELETED`.
         """
         return []
 
+    def get_projects_sync_token(self):
+        """
+        Return a token (a string) identifying the current state of the
+        backend projects, for example the current date and time. If this
+        returns a token, it will be passed as the `since` parameter of
+        :meth:`get_projects` on the next update, so that only the projects
+        that changed are fetched. Return `None` (the default) if the backend
+        doesn't support incremental updates.
+        """
+        return None
+
     def post_push_entries(self):
         """
         Called after the entries have been pushed. Useful if you need to do
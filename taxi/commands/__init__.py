@@ -1,3 +0,0 @@
-from . import (  # NOQA
-    base, alias, autofill, clean_aliases, commit, edit, plugin, project, show, start, status, stop, update
-)
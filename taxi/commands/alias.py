@@ -6,7 +6,7 @@ import click
 
 from ..aliases import Mapping, aliases_database
 from ..projects import Project
-from .base import cli, get_timesheet_collection_for_context
+from .base import cli, iter_timesheet_entries_for_context
 
 
 @cli.group(invoke_without_command=True)
@@ -108,21 +108,14 @@ def list_aliases(ctx, search, backend, used, inactive):
     aliases_mappings = aliases_database.filter_from_alias(search, backend)
 
     if used:
-        timesheet_collection = get_timesheet_collection_for_context(ctx)
-        aliases_count = timesheet_collection.get_popular_aliases(limit=None)
-        used_aliases = set(alias for alias, count in aliases_count)
+        used_aliases = set(entry.alias for date, entry in iter_timesheet_entries_for_context(ctx))
 
         aliases_mappings = collections.OrderedDict(
             (alias, m) for alias, m in aliases_mappings.items() if alias in used_aliases
         )
 
-    for alias, m in aliases_mappings.items():
-        if m.mapping is not None:
-            project, activity = ctx.obj['projects_db'].mapping_to_project(m)
-        else:
-            project = None
-
-        if not inactive and (not project or not project.is_active()):
+    for (alias, m, project, activity, is_active) in ctx.obj['projects_db'].resolve_mappings(aliases_mappings):
+        if not inactive and not is_active:
             continue
 
-        ctx.obj['view'].alias_detail((alias, m), project)
+        ctx.obj['view'].alias_detail((alias, m), project, is_active)
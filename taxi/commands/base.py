@@ -2,21 +2,21 @@ from __future__ import unicode_literals
 
 import datetime
 import functools
+import importlib
+import io
 import os
 import sys
 
 import click
-import pkg_resources
 import six
 from appdirs import AppDirs
-from click._termui_impl import Editor
 
 from .. import __version__
-from ..aliases import aliases_database
+from ..aliases import SharedAliasesDb, aliases_database
 from ..plugins import plugins_registry
 from ..projects import ProjectsDb
 from ..settings import Settings
-from ..timesheet import TimesheetCollection, TimesheetParser
+from ..timesheet import TimesheetCache, TimesheetCollection, TimesheetParser
 from ..ui.tty import TtyUi
 from .types import Date, ExpandedPath, Hostname
 
@@ -36,14 +36,37 @@ def get_timesheet_collection_for_context(ctx, entries_file=None):
     if not entries_file:
         entries_file = ctx.obj['settings'].get_entries_file_path(False)
 
-    parser = TimesheetParser(
+    return TimesheetCollection.load(
+        entries_file, ctx.obj['settings']['nb_previous_files'], get_timesheet_parser_for_context(ctx),
+        ctx.obj['settings']['nb_threads'], ctx.obj['timesheet_cache']
+    )
+
+
+def iter_timesheet_entries_for_context(ctx, entries_file=None):
+    """
+    Return an iterator of `(date, entry)` tuples of the current timesheet(s), which are parsed while being read. This
+    is the read-only counterpart of :func:`get_timesheet_collection_for_context`, see
+    :meth:`~taxi.timesheet.TimesheetCollection.iter_entries`.
+    """
+    if not entries_file:
+        entries_file = ctx.obj['settings'].get_entries_file_path(False)
+
+    return TimesheetCollection.iter_entries(
+        entries_file, ctx.obj['settings']['nb_previous_files'], get_timesheet_parser_for_context(ctx)
+    )
+
+
+def get_timesheet_parser_for_context(ctx):
+    """
+    Return a :class:`~taxi.timesheet.TimesheetParser` object configured with the settings of the current command
+    context.
+    """
+    return TimesheetParser(
         date_format=ctx.obj['settings']['date_format'],
         add_date_to_bottom=ctx.obj['settings'].get_add_to_bottom(),
         flags_repr=ctx.obj['settings'].get_flags(),
     )
 
-    return TimesheetCollection.load(entries_file, ctx.obj['settings']['nb_previous_files'], parser)
-
 
 def populate_aliases(aliases):
     aliases_database.reset()
@@ -59,6 +82,7 @@ def create_config_file(filename):
     Create main configuration file if it doesn't exist.
     """
     import textwrap
+    from click._termui_impl import Editor
     from six.moves.urllib import parse
 
     if not os.path.exists(filename):
@@ -96,7 +120,9 @@ def create_config_file(filename):
             )
         ) + '\n')
 
-        config = pkg_resources.resource_string('taxi', 'etc/taxirc.sample').decode('utf-8')
+        sample_config_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'etc', 'taxirc.sample')
+        with io.open(sample_config_file, encoding='utf-8') as f:
+            config = f.read()
         context = {}
         available_backends = plugins_registry.get_available_backends()
 
@@ -135,15 +161,24 @@ def create_config_file(filename):
 
         with open(filename, 'w') as f:
             f.write(templated_config)
-    else:
-        settings = Settings(filename)
-        conversions = settings.needed_conversions
 
-        if conversions:
-            for conversion in conversions:
-                conversion()
 
-            settings.write_config()
+def convert_config_file(settings):
+    """
+    Apply the conversions needed by the configuration file of the given settings, if any. Return `True` if the
+    configuration file was converted.
+    """
+    conversions = settings.needed_conversions
+
+    if not conversions:
+        return False
+
+    for conversion in conversions:
+        conversion()
+
+    settings.write_config()
+
+    return True
 
 
 class AliasedCommand(click.Command):
@@ -163,14 +198,53 @@ class AliasedGroup(click.Group):
         * Exact command name
         * Command aliases
         * Command prefix
+
+    Commands given in the ``lazy_commands`` kwarg, a dict {command name: module
+    name or (module name, aliases) tuple}, are only imported when they're used,
+    their module being expected to register them in the group. The aliases of
+    lazy commands are only declared there, and are given to the command once it
+    is registered. Commands registered via entry points are only loaded if the
+    command is not a built-in one.
     """
+    def __init__(self, *args, **kwargs):
+        self.lazy_commands = {}
+        self.lazy_commands_aliases = {}
+
+        for name, module in six.iteritems(kwargs.pop('lazy_commands', {})):
+            if isinstance(module, tuple):
+                module, aliases = module
+
+                for alias in aliases:
+                    self.lazy_commands_aliases[alias] = name
+
+            self.lazy_commands[name] = module
+
+        super(AliasedGroup, self).__init__(*args, **kwargs)
+
+    def add_command(self, cmd, name=None):
+        super(AliasedGroup, self).add_command(cmd, name)
+
+        if isinstance(cmd, AliasedCommand):
+            cmd.aliases.update(
+                alias for alias, command_name in six.iteritems(self.lazy_commands_aliases)
+                if command_name == (name or cmd.name)
+            )
+
     def get_command(self, ctx, cmd_name):
-        rv = super(AliasedGroup, self).get_command(ctx, cmd_name)
+        rv = self._get_command(ctx, cmd_name)
         # Exact command exists, go with this
         if rv is not None:
             return rv
 
         # Check in aliases
+        if cmd_name in self.lazy_commands_aliases:
+            return self._get_command(ctx, self.lazy_commands_aliases[cmd_name])
+
+        plugins_registry.register_commands()
+        rv = super(AliasedGroup, self).get_command(ctx, cmd_name)
+        if rv is not None:
+            return rv
+
         for name, command in six.iteritems(self.commands):
             if (isinstance(command, AliasedCommand)
                     and cmd_name in command.aliases):
@@ -182,11 +256,22 @@ class AliasedGroup(click.Group):
         if not matches:
             return None
         elif len(matches) == 1:
-            return click.Group.get_command(self, ctx, matches[0])
+            return self._get_command(ctx, matches[0])
         ctx.fail('Too many matches: %s' % ', '.join(sorted(matches)))
 
         return None
 
+    def _get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            importlib.import_module(self.lazy_commands[cmd_name])
+
+        return super(AliasedGroup, self).get_command(ctx, cmd_name)
+
+    def list_commands(self, ctx):
+        plugins_registry.register_commands()
+
+        return sorted(set(self.commands) | set(self.lazy_commands))
+
 
 def date_options(func):
     """
@@ -250,7 +335,20 @@ def get_data_dir():
     return xdg_dirs.user_data_dir
 
 
-@click.group(cls=AliasedGroup)
+@click.group(cls=AliasedGroup, lazy_commands={
+    'alias': 'taxi.commands.alias',
+    'autofill': 'taxi.commands.autofill',
+    'clean-aliases': 'taxi.commands.clean_aliases',
+    'commit': ('taxi.commands.commit', ['ci']),
+    'edit': 'taxi.commands.edit',
+    'plugin': 'taxi.commands.plugin',
+    'project': 'taxi.commands.project',
+    'show': 'taxi.commands.show',
+    'start': 'taxi.commands.start',
+    'status': 'taxi.commands.status',
+    'stop': 'taxi.commands.stop',
+    'update': 'taxi.commands.update',
+})
 @click.option('--config', '-c', default=get_config_file(),
               type=ExpandedPath(dir_okay=False),
               help="Path to the configuration file to use.")
@@ -262,12 +360,17 @@ def get_data_dir():
               help="Print version number and exit.")
 @click.pass_context
 def cli(ctx, config, taxi_dir):
-    create_config_file(config)
-    settings = Settings(config)
-
     if not os.path.exists(taxi_dir):
         os.makedirs(taxi_dir)
 
+    settings_snapshot_file = os.path.join(os.path.expanduser(taxi_dir), 'settings_snapshot.json')
+    shared_aliases_db = SharedAliasesDb(os.path.join(os.path.expanduser(taxi_dir), 'shared_aliases.json'))
+    create_config_file(config)
+    settings = Settings(config, settings_snapshot_file, shared_aliases_db)
+
+    if convert_config_file(settings):
+        settings = Settings(config, settings_snapshot_file, shared_aliases_db)
+
     populate_aliases(settings.get_aliases())
     populate_backends(settings.get_backends())
 
@@ -275,7 +378,4 @@ def cli(ctx, config, taxi_dir):
     ctx.obj['settings'] = settings
     ctx.obj['view'] = TtyUi()
     ctx.obj['projects_db'] = ProjectsDb(os.path.expanduser(taxi_dir))
-
-
-# This can't be called from inside a command because Click will already have built its commands list
-plugins_registry.register_commands()
+    ctx.obj['timesheet_cache'] = TimesheetCache(os.path.join(os.path.expanduser(taxi_dir), 'timesheets_cache'))
@@ -1,7 +1,6 @@
 from __future__ import unicode_literals
 
 import click
-import six
 
 from ..aliases import aliases_database
 from .base import cli
@@ -19,17 +18,17 @@ def clean_aliases(ctx, force_yes):
     """
     inactive_aliases = []
 
-    for (alias, mapping) in six.iteritems(aliases_database):
+    resolved_mappings = ctx.obj['projects_db'].resolve_mappings(
+        aliases_database
+    )
+
+    for (alias, mapping, project, activity, is_active) in resolved_mappings:
         # Ignore local aliases
         if mapping.mapping is None:
             continue
 
-        project = ctx.obj['projects_db'].get(mapping.mapping[0],
-                                             mapping.backend)
-
-        if (project is None or not project.is_active() or
-                (mapping.mapping[1] is not None
-                 and project.get_activity(mapping.mapping[1]) is None)):
+        if (not is_active or
+                (mapping.mapping[1] is not None and activity is None)):
             inactive_aliases.append(((alias, mapping), project))
 
     if not inactive_aliases:
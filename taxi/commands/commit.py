@@ -1,19 +1,21 @@
 from __future__ import unicode_literals
 
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 import datetime
 import itertools
+import threading
 
 import click
 import six
+from six.moves import queue
 
 from ..aliases import aliases_database
-from ..backends import PushEntriesFailed
+from ..backends import BaseBackend, PushEntriesFailed
 from ..plugins import plugins_registry
 from .base import AliasedCommand, cli, date_options, get_timesheet_collection_for_context, populate_backends
 
 
-@cli.command(cls=AliasedCommand, aliases=['ci'], short_help="Commit entries to the backend.")
+@cli.command(cls=AliasedCommand, short_help="Commit entries to the backend.")
 @click.option('-f', '--file', 'f',
               type=click.Path(exists=True, dir_okay=False),
               help="Path to the file to commit.")
@@ -42,31 +44,26 @@ def commit(ctx, f, force_yes, date):
     ctx.obj['view'].pushing_entries()
     backends_entries = defaultdict(list)
 
+    def entry_pushed(backend, entry):
+        backends_entries[backend].append(entry)
+        ctx.obj['view'].pushed_entry(entry)
+
     try:
         # Push entries
+        entries_to_push = OrderedDict()
+
         for timesheet in timesheet_collection.timesheets:
-            entries_to_push = get_entries_to_push(
+            entries_to_push_for_timesheet = get_entries_to_push(
                 timesheet, date, ctx.obj['settings']['regroup_entries']
             )
 
-            for (entries_date, entries) in entries_to_push.items():
+            for (entries_date, entries) in entries_to_push_for_timesheet.items():
                 for entry in entries:
                     backend_name = aliases_database[entry.alias].backend
                     backend = plugins_registry.get_backend(backend_name)
-                    backends_entries[backend].append(entry)
-
-                    try:
-                        backend.push_entry(entries_date, entry)
-                    except Exception as e:
-                        entry.push_error = six.text_type(e)
-                    except KeyboardInterrupt:
-                        entry.push_error = ("Interrupted, check status in"
-                                            " backend")
-                        raise
-                    else:
-                        entry.push_error = None
-                    finally:
-                        ctx.obj['view'].pushed_entry(entry)
+                    entries_to_push.setdefault(backend, []).append((entries_date, entry))
+
+        push_entries(entries_to_push, entry_pushed)
 
         # Call post_push_entries on backends
         backends_post_push(backends_entries)
@@ -85,6 +82,229 @@ def commit(ctx, f, force_yes, date):
                                            ignored_entries_list)
 
 
+def get_push_workers(backend):
+    """
+    Return the number of batches of entries that can be pushed concurrently to the given backend, set with the
+    `push_workers` option of the backend URL. Defaults to 1 since backends are not expected to support concurrent
+    pushes.
+    """
+    try:
+        return max(int(getattr(backend, 'options', {}).get('push_workers', 1)), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def supports_batch_push(backend):
+    """
+    Return `True` if the given backend implements :meth:`~taxi.backends.BaseBackend.push_entries` itself, instead of
+    relying on the default implementation that pushes the entries one by one. Backends that don't inherit from
+    :class:`~taxi.backends.BaseBackend` and don't have a `push_entries` method are pushed to entry by entry.
+    """
+    if not hasattr(backend, 'push_entries'):
+        return False
+
+    return not (isinstance(backend, BaseBackend) and six.get_unbound_function(type(backend).push_entries) is
+                six.get_unbound_function(BaseBackend.push_entries))
+
+
+def get_push_batch_size(backend):
+    """
+    Return the maximum number of entries to push at once to the given backend with
+    :meth:`~taxi.backends.BaseBackend.push_entries`, set with the `push_batch_size` option of the backend URL.
+    Defaults to the `push_batch_size` attribute of the backend. The option only has an effect on backends that
+    implement :meth:`~taxi.backends.BaseBackend.push_entries` (see :func:`supports_batch_push`) and is ignored for
+    the others, since an interrupted batch would mark all its entries as interrupted, even the ones that were already
+    pushed one by one.
+    """
+    if not hasattr(backend, 'push_entries'):
+        return 1
+
+    default_batch_size = getattr(backend, 'push_batch_size', 1)
+
+    if not supports_batch_push(backend):
+        return default_batch_size
+
+    try:
+        return max(int(getattr(backend, 'options', {}).get('push_batch_size', default_batch_size)), 1)
+    except (TypeError, ValueError):
+        return default_batch_size
+
+
+def get_push_error(e):
+    """
+    Return the error message to use as the push error of the entries that failed to be pushed because of the given
+    exception.
+    """
+    if isinstance(e, PushEntriesFailed):
+        return e.message if e.message is not None else "Couldn't push entries"
+
+    try:
+        return six.text_type(e)
+    except Exception:
+        return e.__class__.__name__
+
+
+def push_batch(backend, batch):
+    """
+    Push the given `batch` (a list of `(date, entry)` tuples) to `backend` and return the list of the push errors of
+    its entries, `None` meaning the entry was successfully pushed. Backends that don't have a `push_entries` method
+    get the entries one by one with `push_entry`.
+    """
+    if not hasattr(backend, 'push_entries'):
+        push_errors = []
+
+        for (entries_date, entry) in batch:
+            try:
+                backend.push_entry(entries_date, entry)
+            except Exception as e:
+                push_errors.append(get_push_error(e))
+            else:
+                push_errors.append(None)
+
+        return push_errors
+
+    try:
+        backend.push_entries(batch)
+    except PushEntriesFailed as e:
+        if e.entries:
+            return [
+                (e.entries[entry] if e.entries[entry] is not None else get_push_error(e))
+                if entry in e.entries else None
+                for (entries_date, entry) in batch
+            ]
+        else:
+            return [get_push_error(e)] * len(batch)
+    except Exception as e:
+        return [get_push_error(e)] * len(batch)
+    else:
+        return [None] * len(batch)
+
+
+def push_entries(backends_entries, entry_pushed_callback):
+    """
+    Push the entries of the given `{backend: [(date, entry), ...]}` dict to their backend in batches (see
+    :func:`get_push_batch_size`), set their `push_error` attribute and call `entry_pushed_callback(backend, entry)`
+    once each entry has been pushed. The batches of each backend are pushed by their own threads (see
+    :func:`get_push_workers`), so that backends are pushed to in parallel. If there's a single backend using a single
+    worker, batches are pushed sequentially by the calling thread. On `KeyboardInterrupt`, the batches that are still
+    being pushed by other threads are not waited for and their entries are marked as interrupted.
+    """
+    backends_batches = []
+
+    for (backend, entries) in six.iteritems(backends_entries):
+        batch_size = get_push_batch_size(backend)
+        backends_batches.append((backend, [
+            entries[i:i + batch_size] for i in range(0, len(entries), batch_size)
+        ]))
+
+    def batch_pushed(backend, batch, push_errors):
+        for ((entries_date, entry), push_error) in zip(batch, push_errors):
+            entry.push_error = push_error
+            entry_pushed_callback(backend, entry)
+
+    def batch_interrupted(backend, batch):
+        batch_pushed(backend, batch, ["Interrupted, check status in backend"] * len(batch))
+
+    if len(backends_batches) <= 1 and all(get_push_workers(backend) == 1 for backend in backends_entries):
+        for (backend, batches) in backends_batches:
+            for batch in batches:
+                try:
+                    push_errors = push_batch(backend, batch)
+                except KeyboardInterrupt:
+                    batch_interrupted(backend, batch)
+                    raise
+
+                batch_pushed(backend, batch, push_errors)
+
+        return
+
+    from multiprocessing.pool import ThreadPool
+
+    # The threads only push the entries and return the result, the entries
+    # and the UI are only updated by the calling thread
+    pools = []
+    tasks = []
+    results = queue.Queue()
+    started_tasks = set()
+    interrupted = threading.Event()
+
+    def push_task(task_id, backend, batch):
+        if interrupted.is_set():
+            return None
+
+        started_tasks.add(task_id)
+
+        # A task that doesn't put its result in the queue would make the
+        # calling thread wait forever
+        try:
+            return (task_id, push_batch(backend, batch))
+        except Exception as e:
+            return (task_id, [get_push_error(e)] * len(batch))
+
+    def task_failed(task_id, batch):
+        return lambda e: results.put((task_id, [get_push_error(e)] * len(batch)))
+
+    for (backend, batches) in backends_batches:
+        pool = ThreadPool(min(get_push_workers(backend), len(batches)))
+        pools.append(pool)
+
+        for batch in batches:
+            callbacks = {'callback': results.put}
+
+            # `error_callback` is not supported on Python 2
+            if six.PY3:
+                callbacks['error_callback'] = task_failed(len(tasks), batch)
+
+            pool.apply_async(push_task, (len(tasks), backend, batch), **callbacks)
+            tasks.append((backend, batch))
+
+        pool.close()
+
+    finished_tasks = set()
+
+    def task_finished(result):
+        # Tasks skipped because of an interruption don't have any result
+        if result is None:
+            return
+
+        task_id, push_errors = result
+        finished_tasks.add(task_id)
+        batch_pushed(tasks[task_id][0], tasks[task_id][1], push_errors)
+
+    try:
+        while len(finished_tasks) < len(tasks):
+            # Use a timeout so that the wait can be interrupted on Python 2
+            try:
+                result = results.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            task_finished(result)
+    except KeyboardInterrupt:
+        interrupted.set()
+
+        # The entries of the tasks that finished while the results were being
+        # processed have been pushed, they must not be pushed again
+        while True:
+            try:
+                task_finished(results.get_nowait())
+            except queue.Empty:
+                break
+
+        for task_id in sorted(started_tasks - finished_tasks):
+            batch_interrupted(*tasks[task_id])
+
+        # Threads can't be killed, so the pushes that are still running are
+        # abandoned instead of waited for (the worker threads are daemonic)
+        for pool in pools:
+            pool.terminate()
+
+        raise
+
+    for pool in pools:
+        pool.join()
+
+
 def backends_post_push(backends_entries):
     for backend, entries in six.iteritems(backends_entries):
         try:
@@ -92,13 +312,13 @@ def backends_post_push(backends_entries):
         except PushEntriesFailed as e:
             if e.entries:
                 for entry, error in six.iteritems(e.entries):
-                    entry.push_error = error if error else six.text_type(e)
+                    entry.push_error = error if error else get_push_error(e)
             else:
                 for entry in entries:
-                    entry.push_error = six.text_type(e)
+                    entry.push_error = get_push_error(e)
         except Exception as e:
             for entry in entries:
-                entry.push_error = six.text_type(e)
+                entry.push_error = get_push_error(e)
 
 
 def comment_timesheets_entries(timesheet_collection, date):
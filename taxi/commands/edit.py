@@ -63,10 +63,15 @@ def edit(ctx, file_to_edit, previous_file):
 
     try:
         # Show the status only for the given file if it was specified with the
-        # --file option, or for the files specified in the settings otherwise
-        timesheet_collection = get_timesheet_collection_for_context(
-            ctx, file_to_edit
-        )
+        # --file option, or for the files specified in the settings otherwise.
+        # If the timesheets were already loaded for the autofill, only parse
+        # the lines that changed
+        if timesheet_collection is not None:
+            timesheet_collection.reload()
+        else:
+            timesheet_collection = get_timesheet_collection_for_context(
+                ctx, file_to_edit
+            )
     except ParseError as e:
         ctx.obj['view'].err(e)
     else:
@@ -1,7 +1,6 @@
 from __future__ import unicode_literals
 
 import json
-import pkg_resources
 import subprocess
 import sys
 
@@ -10,7 +9,7 @@ from six.moves.urllib import request
 from six.moves.urllib.error import HTTPError
 
 from .base import cli
-from ..plugins import plugins_registry
+from ..plugins import get_distribution_version, plugins_registry
 from ..ui import echo_error, echo_success
 
 
@@ -58,13 +57,7 @@ def get_installed_plugins():
     """
     Return a dict {plugin_name: version} of installed plugins.
     """
-    return {
-        # Strip the first five characters from the plugin name since all
-        # plugins are expected to start with `taxi-`
-        backend.dist.project_name[5:]: backend.dist.version
-        for backend in backends_registry._entry_points.values()
-        if backend.dist.project_name != 'taxi'
-    }
+    return plugins_registry.get_plugins()
 
 
 def get_plugin_name(plugin):
@@ -125,10 +118,7 @@ def install(ctx, plugin):
                    "Error was:\n\n {}".format(e))
         sys.exit(1)
 
-    try:
-        installed_version = pkg_resources.get_distribution(plugin_name).version
-    except pkg_resources.DistributionNotFound:
-        installed_version = None
+    installed_version = get_distribution_version(plugin_name)
 
     if installed_version is not None and info['version'] == installed_version:
         click.echo("You already have the latest version of {} ({}).".format(
@@ -54,11 +54,7 @@ def get_mapping_matches(search, matches, projects_db):
         matches['mappings'].append((alias_mapping, alias))
 
     project = projects_db.get(mapping[0])
-    project_activity = None
-
-    for activity in project.activities:
-        if activity.id == mapping[1]:
-            project_activity = activity
+    project_activity = project.get_activity(mapping[1]) if project else None
 
     if project and project_activity:
         matches['projects'].append((project, project_activity))
@@ -16,6 +16,8 @@ def status(ctx, date, f, pushed):
     """
     Shows the summary of what's going to be committed to the server.
     """
+    # The timesheets are loaded instead of being streamed so that the
+    # timesheets cache can be used
     try:
         timesheet_collection = get_timesheet_collection_for_context(ctx, f)
     except ParseError as e:
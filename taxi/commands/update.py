@@ -1,10 +1,14 @@
 from __future__ import unicode_literals
 
+from collections import OrderedDict, defaultdict
+import time
+
 import click
 import six
 
 from ..aliases import Mapping
 from ..plugins import plugins_registry
+from ..projects import OutdatedProjectsDbException, Project
 from .base import cli, populate_backends
 
 
@@ -19,39 +23,147 @@ def update(ctx):
 
     ctx.obj['view'].updating_projects_database()
 
+    backends = [
+        (backend_name, plugins_registry.get_backend(backend_name))
+        for backend_name, backend_uri in ctx.obj['settings'].get_backends()
+    ]
+    projects_db = ctx.obj['projects_db']
+
+    try:
+        previous_sync_tokens = projects_db.get_sync_tokens()
+    except OutdatedProjectsDbException:
+        previous_sync_tokens = {}
+
+    def get_previous_projects(backend_name):
+        try:
+            return [project for project in projects_db.get_projects() if project.backend == backend_name]
+        except OutdatedProjectsDbException:
+            return []
+
     projects = []
+    sync_tokens = {}
+
+    for backend_name, result, error in fetch_projects(backends, previous_sync_tokens):
+        if error is not None:
+            ctx.obj['view'].projects_update_failed(backend_name, error)
+
+            # Keep the projects the backend had before the update
+            backend_projects = get_previous_projects(backend_name)
+            sync_token = previous_sync_tokens.get(backend_name)
+        else:
+            backend_projects, sync_token, incremental = result
+
+            for project in backend_projects:
+                project.backend = backend_name
+
+            # Only the projects that changed since the last update were
+            # fetched, merge them with the existing ones
+            if incremental:
+                backend_projects = merge_projects(get_previous_projects(backend_name), backend_projects)
 
-    for backend_name, backend_uri in ctx.obj['settings'].get_backends():
-        backend = plugins_registry.get_backend(backend_name)
-        backend_projects = backend.get_projects()
+            backend_projects = [
+                project for project in backend_projects if project.status != Project.STATUS_DELETED
+            ]
 
-        for project in backend_projects:
-            project.backend = backend_name
+        if sync_token is not None:
+            sync_tokens[backend_name] = sync_token
 
         projects += backend_projects
 
-    ctx.obj['projects_db'].update(projects)
+    projects_db.update(projects, sync_tokens)
 
-    # Put the shared aliases in the config file
-    shared_aliases = {}
-    backends_to_clear = set()
+    shared_aliases = defaultdict(dict)
     for project in projects:
         for alias, activity_id in six.iteritems(project.aliases):
-            mapping = Mapping(mapping=(project.id, activity_id),
-                              backend=project.backend)
-            shared_aliases[alias] = mapping
-            backends_to_clear.add(project.backend)
+            shared_aliases[project.backend][alias] = Mapping(mapping=(project.id, activity_id),
+                                                             backend=project.backend)
 
-    for backend in backends_to_clear:
-        ctx.obj['settings'].clear_shared_aliases(backend)
-
-    for alias, mapping in shared_aliases.items():
-        ctx.obj['settings'].add_shared_alias(alias, mapping)
+    if ctx.obj['settings'].update_shared_aliases(shared_aliases):
+        ctx.obj['settings'].write_config()
 
     aliases_after_update = ctx.obj['settings'].get_aliases()
 
-    ctx.obj['settings'].write_config()
-
     ctx.obj['view'].projects_database_update_success(
         aliases_after_update, ctx.obj['projects_db']
     )
+
+
+def get_update_timeout(backend):
+    """
+    Return the maximum number of seconds to wait for the projects of the given backend, set with the `update_timeout`
+    option of the backend URL, or `None` to wait indefinitely.
+    """
+    try:
+        return float(getattr(backend, 'options', {})['update_timeout'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def get_backend_projects(backend, since=None):
+    """
+    Return a `(projects, sync_token, incremental)` tuple with the projects of the given backend. If the backend
+    supports incremental updates and `since` is set, only the projects that changed since the `since` sync token are
+    returned and `incremental` is True.
+    """
+    # Get the sync token before fetching the projects so that projects that
+    # change during the update are fetched again on the next one
+    sync_token = backend.get_projects_sync_token()
+
+    if sync_token is not None and since is not None:
+        return (backend.get_projects(since=since), sync_token, True)
+
+    return (backend.get_projects(), sync_token, False)
+
+
+def merge_projects(projects, changed_projects):
+    """
+    Return the given list of `projects` with the projects of `changed_projects` replacing the ones with the same id.
+    New projects are added at the end of the list.
+    """
+    changed_projects_by_id = OrderedDict((project.id, project) for project in changed_projects)
+    merged_projects = [changed_projects_by_id.pop(project.id, project) for project in projects]
+
+    return merged_projects + list(changed_projects_by_id.values())
+
+
+def fetch_projects(backends, sync_tokens):
+    """
+    Get the projects of the given list of `(backend_name, backend)` tuples concurrently (see
+    :func:`get_backend_projects`) and return a list of `(backend_name, result, error)` tuples in the same order.
+    `sync_tokens` is a dict of {backend_name: sync_token} items from the previous update. `error` is `None` if the
+    projects could be fetched before the backend timeout (see :func:`get_update_timeout`), or the error message
+    otherwise.
+    """
+    if not backends:
+        return []
+
+    from multiprocessing import TimeoutError
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(len(backends))
+    start_time = time.time()
+    results = [
+        pool.apply_async(get_backend_projects, (backend, sync_tokens.get(backend_name)))
+        for backend_name, backend in backends
+    ]
+    pool.close()
+
+    backends_projects = []
+
+    for (backend_name, backend), result in zip(backends, results):
+        timeout = get_update_timeout(backend)
+
+        # All the backends started fetching their projects at the same time
+        if timeout is not None:
+            timeout = max(start_time + timeout - time.time(), 0)
+
+        try:
+            backends_projects.append((backend_name, result.get(timeout), None))
+        except TimeoutError:
+            backends_projects.append(
+                (backend_name, None, "timed out after %g seconds" % get_update_timeout(backend))
+            )
+        except Exception as e:
+            backends_projects.append((backend_name, None, six.text_type(e) or e.__class__.__name__))
+
+    return backends_projects
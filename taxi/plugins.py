@@ -1,6 +1,5 @@
 from __future__ import unicode_literals
 
-import pkg_resources
 from six.moves.urllib import parse
 
 from .exceptions import TaxiException
@@ -15,9 +14,12 @@ class PluginsRegistry(object):
 
     The plugins registry should be initialized via :meth:`populate`. The list
     of available plugins is automatically discovered by checking the
-    ``taxi.backends`` and ``taxi.commands`` entry points.
+    ``taxi.backends`` and ``taxi.commands`` entry points. Since this requires
+    going through all the installed distributions, this is only done the first
+    time a plugin is needed.
 
-    Once populated, backend objects can be loaded and retrieved using the :meth:`get_backend` method::
+    Once populated, backend objects can be loaded and retrieved using the :meth:`get_backend` method. Backends are only
+    loaded and instantiated the first time they're retrieved::
 
         my_backend = plugins_registry.get_backend('backend_name')
 
@@ -29,59 +31,87 @@ class PluginsRegistry(object):
     ENTRY_POINTS = (BACKENDS_ENTRY_POINT, COMMANDS_ENTRY_POINT)
 
     def __init__(self):
-        self._entry_points = {}
+        self._entry_points = None
+        self._plugins = None
+        self._commands_registered = False
+        # Backend name -> URI, and backend name -> backend instance for the
+        # backends that were already retrieved
+        self._backends_uris = {}
         self._backends_registry = {}
 
+    def _scan_entry_points(self):
         # Load the entry points and index them to avoid iterating every time we
         # need a specific plugin
-        for entry_point_type in self.ENTRY_POINTS:
-            self._entry_points[entry_point_type] = {}
+        self._entry_points = dict((entry_point_type, {}) for entry_point_type in self.ENTRY_POINTS)
+        self._plugins = {}
 
-            for entry_point in pkg_resources.iter_entry_points(entry_point_type):
-                self._entry_points[entry_point_type][entry_point.name] = entry_point
+        for group, entry_point, distribution_name, distribution_version in iter_entry_points(self.ENTRY_POINTS):
+            self._entry_points[group][entry_point.name] = entry_point
 
-    def get_plugins(self):
-        plugins_list = {}
+            # Strip the first five characters from the plugin name since all
+            # plugins are expected to start with `taxi-`
+            plugin_name = distribution_name[5:]
+            if plugin_name:
+                self._plugins[plugin_name] = distribution_version
+
+    def get_entry_points(self, entry_point_type):
+        """
+        Return a dict {name: entry_point} of the entry points of the given
+        type.
+        """
+        if self._entry_points is None:
+            self._scan_entry_points()
 
-        for entry_point_type, entry_points in self._entry_points.items():
-            for entry_point in entry_points.values():
-                plugin_name = entry_point.dist.project_name[5:]
-                plugin_version = entry_point.dist.version
+        return self._entry_points.get(entry_point_type, {})
 
-                if plugin_name:
-                    plugins_list[plugin_name] = plugin_version
+    def get_plugins(self):
+        """
+        Return a dict {plugin_name: version} of installed plugins.
+        """
+        if self._plugins is None:
+            self._scan_entry_points()
 
-        return plugins_list
+        return self._plugins
 
     def get_available_backends(self):
         """
         Return the names of the available backends.
         """
-        return self._entry_points[self.BACKENDS_ENTRY_POINT].keys()
+        return list(self.get_entry_points(self.BACKENDS_ENTRY_POINT).keys())
 
     def get_backend(self, key):
         """
-        Return the backend instance for the backend with the given name.
+        Return the backend instance for the backend with the given name. Can
+        raise :exc:`BackendNotFoundError` if the backend could not be found in
+        the registered entry points.
         """
+        if key not in self._backends_registry:
+            self._backends_registry[key] = self._load_backend(self._backends_uris[key])
+
         return self._backends_registry[key]
 
     def get_backends_by_class(self, backend_class):
         """
         Return a list of backends that are instances of the given `backend_class`.
         """
-        return [backend for backend in self._backends_registry.values() if isinstance(backend, backend_class)]
+        return [
+            backend for backend in (self.get_backend(name) for name in self._backends_uris)
+            if isinstance(backend, backend_class)
+        ]
 
     def populate_backends(self, backends):
         """
-        Iterate over the given backends list and instantiate every backend
-        found. Can raise :exc:`BackendNotFoundError` if a backend
-        could not be found in the registered entry points.
+        Register the given backends, that will be instantiated the first time
+        they're retrieved with :meth:`get_backend`. Backends that were already
+        instantiated are kept unless their URI changed.
 
         The `backends` parameter should be a dict with backend names as keys
         and URIs as values.
         """
         for name, uri in backends.items():
-            self._backends_registry[name] = self._load_backend(uri)
+            if self._backends_uris.get(name) != uri:
+                self._backends_registry.pop(name, None)
+                self._backends_uris[name] = uri
 
     def _load_backend(self, backend_uri):
         """
@@ -95,7 +125,7 @@ class PluginsRegistry(object):
         options = dict(parse.parse_qsl(parsed.query))
 
         try:
-            backend = self._entry_points[self.BACKENDS_ENTRY_POINT][parsed.scheme].load()
+            backend = self.get_entry_points(self.BACKENDS_ENTRY_POINT)[parsed.scheme].load()
         except KeyError:
             raise BackendNotFoundError(
                 "The requested backend `%s` could not be found in the "
@@ -115,12 +145,74 @@ class PluginsRegistry(object):
 
     def register_commands(self):
         """
-        Load entry points for custom commands.
+        Load entry points for custom commands. This is only done once, further
+        calls have no effect.
         """
-        for command in self._entry_points[self.COMMANDS_ENTRY_POINT].values():
+        if self._commands_registered:
+            return
+
+        self._commands_registered = True
+
+        for command in self.get_entry_points(self.COMMANDS_ENTRY_POINT).values():
             command.load()
 
 
+def iter_entry_points(groups):
+    """
+    Return an iterator of `(group, entry_point, distribution_name,
+    distribution_version)` tuples for the entry points of the given `groups`
+    of all installed distributions. Use :mod:`importlib.metadata` if it's
+    available since it's much faster to import than :mod:`pkg_resources`.
+    """
+    try:
+        from importlib import metadata
+    except ImportError:
+        import pkg_resources
+
+        for group in groups:
+            for entry_point in pkg_resources.iter_entry_points(group):
+                yield (group, entry_point, entry_point.dist.project_name, entry_point.dist.version)
+
+        return
+
+    seen_distributions = set()
+
+    for distribution in metadata.distributions():
+        distribution_name = distribution.metadata['Name']
+
+        # Distributions can be found several times if they're in several
+        # sys.path entries, only the first one is used on import
+        if distribution_name in seen_distributions:
+            continue
+
+        seen_distributions.add(distribution_name)
+
+        for entry_point in distribution.entry_points:
+            if entry_point.group in groups:
+                yield (entry_point.group, entry_point, distribution_name, distribution.version)
+
+
+def get_distribution_version(distribution_name):
+    """
+    Return the version of the given installed distribution, or `None` if it's
+    not installed.
+    """
+    try:
+        from importlib import metadata
+    except ImportError:
+        import pkg_resources
+
+        try:
+            return pkg_resources.get_distribution(distribution_name).version
+        except pkg_resources.DistributionNotFound:
+            return None
+
+    try:
+        return metadata.version(distribution_name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
 class BackendNotFoundError(TaxiException):
     pass
 
@@ -1,30 +1,36 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from collections import defaultdict
-import copy
+import collections
 import datetime
 import json
 import os
 import re
+import sqlite3
+import tempfile
 
 import six
 
 from .exceptions import TaxiException
+from .utils.file import get_file_mode
 
 
 @six.python_2_unicode_compatible
-class Project:
+class Project(object):
     STATUS_NOT_STARTED = 0
     STATUS_ACTIVE = 1
     STATUS_FINISHED = 2
     STATUS_CANCELLED = 3
+    # Only used by backends to tell a project was deleted in incremental
+    # updates, deleted projects are not stored in the projects db
+    STATUS_DELETED = 4
 
     STATUSES = {
         STATUS_NOT_STARTED: 'Not started',
         STATUS_ACTIVE: 'Active',
         STATUS_FINISHED: 'Finished',
         STATUS_CANCELLED: 'Cancelled',
+        STATUS_DELETED: 'Deleted',
     }
 
     SHORT_STATUSES = {
@@ -32,10 +38,19 @@ class Project:
         STATUS_ACTIVE: 'A',
         STATUS_FINISHED: 'F',
         STATUS_CANCELLED: 'C',
+        STATUS_DELETED: 'D',
     }
 
     STR_TUPLE_REGEXP = r'^(\d+)(?:/(\d+))?$'
 
+    # Attributes stored in the projects db, along with the activities and
+    # any other attribute set by the backends
+    FIELDS = ('id', 'name', 'status', 'description', 'budget', 'aliases', 'start_date', 'end_date', 'backend')
+
+    # `__dict__` keeps backends able to set other attributes. It's only
+    # allocated for the projects that have such attributes
+    __slots__ = FIELDS + ('_activities', '_activities_by_id', '_nb_indexed_activities', '__dict__')
+
     def __init__(self, id, name, status=None, description=None, budget=None):
         self.id = int(id)
         self.name = name
@@ -82,15 +97,29 @@ Description: %s""" % (self.id, self.name, status, start_date, end_date,
 
         return formatted_date
 
+    @property
+    def activities(self):
+        return self._activities
+
+    @activities.setter
+    def activities(self, activities):
+        self._activities = activities
+        self._activities_by_id = None
+
     def add_activity(self, activity):
         self.activities.append(activity)
 
     def get_activity(self, id):
-        for activity in self.activities:
-            if activity.id == id:
-                return activity
+        # The activities list can be modified directly, so rebuild the
+        # mapping when activities were added since it was built
+        if self._activities_by_id is None or self._nb_indexed_activities != len(self._activities):
+            self._activities_by_id = {}
+            self._nb_indexed_activities = len(self._activities)
+
+            for activity in self._activities:
+                self._activities_by_id.setdefault(activity.id, activity)
 
-        return None
+        return self._activities_by_id.get(id)
 
     def is_active(self):
         return (self.status == self.STATUS_ACTIVE and
@@ -137,95 +166,321 @@ Description: %s""" % (self.id, self.name, status, start_date, end_date,
             return six.text_type(t[0])
 
 
-class Activity:
+class Activity(object):
+    # See `Project.__slots__`
+    __slots__ = ('id', 'name', 'price', '__dict__')
+
     def __init__(self, id, name, price):
         self.id = int(id)
         self.name = name
         self.price = price
 
 
+ResolvedMapping = collections.namedtuple('ResolvedMapping', ['alias', 'mapping', 'project', 'activity', 'is_active'])
+
+
 class ProjectsDb:
+    """
+    The projects database stores the projects fetched from the backends in an SQLite database, indexed by project id
+    and backend and by the trigrams of the project names, so that looking up or searching projects only loads the
+    matching projects. The database is opened on
+    first use. Databases stored in the legacy JSON format (see :class:`LocalProjectsDb`) are migrated automatically.
+    """
+    # Legacy JSON projects db, migrated to PROJECTS_DB_FILE when found
     PROJECTS_FILE = 'projects.json'
+    PROJECTS_DB_FILE = 'projects.db'
+    VERSION = 4
+    MAX_QUERY_PARAMETERS = 500
+
+    SCHEMA = """
+        CREATE TABLE projects (
+            position INTEGER PRIMARY KEY,
+            id INTEGER NOT NULL,
+            backend TEXT,
+            search_name TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX projects_id_backend ON projects (id, backend);
+        CREATE TABLE sync_tokens (
+            backend TEXT PRIMARY KEY,
+            token TEXT NOT NULL
+        );
+        CREATE TABLE search_trigrams (
+            trigram TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (trigram, position)
+        ) WITHOUT ROWID;
+    """
 
     def __init__(self, path):
         self.path = path
         self.projects_database_file = os.path.join(self.path,
-                                                   self.PROJECTS_FILE)
-        self._projects_by_id_cache = None
+                                                   self.PROJECTS_DB_FILE)
+        self.legacy_projects_database_file = os.path.join(self.path,
+                                                          self.PROJECTS_FILE)
+        self._connection = None
         self._projects_cache = None
+        self._sync_tokens_cache = None
+
+    def get_connection(self):
+        """
+        Return the connection to the projects database, or `None` if the database doesn't exist (eg. ``taxi update``
+        was never run). Raise :exc:`OutdatedProjectsDbException` if the database needs to be updated.
+        """
+        if self._connection is not None:
+            return self._connection
+
+        if not os.path.exists(self.projects_database_file):
+            if not os.path.exists(self.legacy_projects_database_file):
+                return None
+
+            self.migrate_legacy_db()
+
+        connection = sqlite3.connect(self.projects_database_file)
+
+        try:
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+        except sqlite3.DatabaseError:
+            version = None
+
+        if version is None or version < self.VERSION:
+            connection.close()
+            raise OutdatedProjectsDbException()
+
+        self._connection = connection
+
+        return connection
+
+    def migrate_legacy_db(self):
+        """
+        Convert the legacy JSON projects db to the current format and remove it. Raise
+        :exc:`OutdatedProjectsDbException` if it's too old to be converted.
+        """
+        with open(self.legacy_projects_database_file, 'r') as projects_db:
+            if not os.fstat(projects_db.fileno()).st_size:
+                lpdb = LocalProjectsDb()
+            else:
+                try:
+                    lpdb = json.load(projects_db, cls=LocalProjectsDbDecoder)
+                # Pre-4.0 used a pickle-based format for the projects db
+                except (UnicodeDecodeError, ValueError):
+                    raise OutdatedProjectsDbException()
+
+        if lpdb.VERSION < LocalProjectsDb.VERSION:
+            raise OutdatedProjectsDbException()
+
+        self.update(lpdb.projects, lpdb.sync_tokens)
+        os.remove(self.legacy_projects_database_file)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
 
     def get_projects(self):
         if self._projects_cache is not None:
             return self._projects_cache
 
-        try:
-            if not os.stat(self.projects_database_file).st_size:
-                return []
-        # If the db file doesn't exist (eg. ``taxi update`` not run), return an
-        # empty list
-        except OSError:
+        connection = self.get_connection()
+
+        if connection is None:
             return []
 
-        with open(self.projects_database_file, 'r') as projects_db:
-            try:
-                lpdb = json.load(projects_db, cls=LocalProjectsDbDecoder)
-            # Pre-4.0 used a pickle-based format for the projects db
-            except (UnicodeDecodeError, ValueError):
-                raise OutdatedProjectsDbException()
+        self._projects_cache = [
+            load_project(json.loads(data))
+            for (data,) in connection.execute('SELECT data FROM projects ORDER BY position')
+        ]
 
-        if lpdb.VERSION < LocalProjectsDb.VERSION:
-            raise OutdatedProjectsDbException()
+        return self._projects_cache
+
+    def get_sync_tokens(self):
+        """
+        Return a dict of {backend_name: sync_token} items, the sync tokens being the ones stored during the last
+        update. See :meth:`taxi.backends.BaseBackend.get_projects_sync_token`.
+        """
+        if self._sync_tokens_cache is not None:
+            return self._sync_tokens_cache
+
+        connection = self.get_connection()
 
-        self._projects_cache = lpdb.projects
+        if connection is None:
+            return {}
 
-        return lpdb.projects
+        self._sync_tokens_cache = dict(connection.execute('SELECT backend, token FROM sync_tokens'))
 
-    def update(self, projects):
-        lpdb = LocalProjectsDb(projects)
+        return self._sync_tokens_cache
 
-        with open(self.projects_database_file, 'w') as output:
-            json.dump(lpdb.get_dump_object(), output)
+    def update(self, projects, sync_tokens=None):
+        # Build the new database next to the current one and replace it
+        # once it's complete, so that it's never left half-written. The
+        # temporary database has a unique name so that concurrent updates
+        # don't write to the same file
+        fd, temp_database_file = tempfile.mkstemp(dir=self.path, prefix='.' + self.PROJECTS_DB_FILE, suffix='.tmp')
+        os.close(fd)
+
+        try:
+            self._write_database(temp_database_file, projects, sync_tokens)
+            # mkstemp creates files that can only be read by their owner
+            os.chmod(temp_database_file, get_file_mode(self.projects_database_file))
+            self.close()
+            # os.replace doesn't exist on Python 2, but os.rename is atomic too
+            # on POSIX systems
+            getattr(os, 'replace', os.rename)(temp_database_file, self.projects_database_file)
+        except Exception:
+            os.remove(temp_database_file)
+            raise
 
         self._projects_cache = None
-        self._projects_by_id_cache = None
+        self._sync_tokens_cache = None
 
-    def search(self, search, active_only=False, backend=None):
-        projects = self.get_projects()
-        found_list = []
+    def _write_database(self, database_file, projects, sync_tokens):
+        """
+        Create the projects database in `database_file`, with the given `projects` and `sync_tokens`.
+        """
+        connection = sqlite3.connect(database_file)
 
-        for project in projects:
-            found = True
+        try:
+            with connection:
+                connection.executescript(self.SCHEMA)
+                connection.executemany(
+                    'INSERT INTO projects (position, id, backend, search_name, data) VALUES (?, ?, ?, ?, ?)', (
+                        (position, project.id, project.backend, (project.name or '').lower(),
+                         json.dumps(dump_project(project)))
+                        for position, project in enumerate(projects)
+                    )
+                )
+                connection.executemany(
+                    'INSERT INTO search_trigrams (trigram, position) VALUES (?, ?)', (
+                        (trigram, position)
+                        for position, project in enumerate(projects)
+                        for trigram in get_trigrams((project.name or '').lower())
+                    )
+                )
+                connection.executemany(
+                    'INSERT INTO sync_tokens (backend, token) VALUES (?, ?)', six.iteritems(sync_tokens or {})
+                )
+                connection.execute('PRAGMA user_version = %d' % self.VERSION)
+        finally:
+            connection.close()
 
-            for s in search:
-                s = s.lower()
-                found = (project.name.lower().find(s) > -1 or
-                         str(project.id) == s)
+    def search(self, search, active_only=False, backend=None):
+        connection = self.get_connection()
 
-                if not found:
-                    break
+        if connection is None:
+            return []
 
-            found = found and (backend is None or project.backend ==
-                               backend)
+        conditions = []
+        params = []
+
+        for s in search:
+            s = s.lower()
+            trigrams = get_trigrams(s)
+
+            # Use the trigrams index to only check the names that contain all
+            # the trigrams of the search term
+            if trigrams:
+                name_condition = (
+                    'position IN (SELECT position FROM search_trigrams WHERE trigram IN (%s) GROUP BY position'
+                    ' HAVING COUNT(*) = ?) AND instr(search_name, ?) > 0' % ', '.join(['?'] * len(trigrams))
+                )
+                params += list(trigrams) + [len(trigrams), s]
+            else:
+                name_condition = 'instr(search_name, ?) > 0'
+                params.append(s)
+
+            # Search terms can also be project ids
+            if re.match(r'^[0-9]+$', s) and six.text_type(int(s)) == s:
+                conditions.append('((%s) OR id = ?)' % name_condition)
+                params.append(int(s))
+            else:
+                conditions.append('(%s)' % name_condition)
+
+        if backend is not None:
+            conditions.append('backend = ?')
+            params.append(backend)
+
+        query = 'SELECT data FROM projects'
+
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+
+        found_list = [
+            load_project(json.loads(data))
+            for (data,) in connection.execute(query + ' ORDER BY position', params)
+        ]
 
-            if found:
-                if not active_only or project.is_active():
-                    found_list.append(project)
+        if active_only:
+            found_list = [project for project in found_list if project.is_active()]
 
         return found_list
 
     def get(self, id, backend=None):
-        if self._projects_by_id_cache is None:
-            projects = self.get_projects()
-            self._projects_by_id_cache = defaultdict(list)
+        connection = self.get_connection()
+
+        if connection is None:
+            return None
+
+        if backend is None:
+            row = connection.execute(
+                'SELECT data FROM projects WHERE id = ? ORDER BY position LIMIT 1', (id,)
+            ).fetchone()
+        else:
+            row = connection.execute(
+                'SELECT data FROM projects WHERE id = ? AND backend = ? ORDER BY position LIMIT 1', (id, backend)
+            ).fetchone()
+
+        return load_project(json.loads(row[0])) if row is not None else None
+
+    def resolve_mappings(self, mappings):
+        """
+        Return a list of :class:`ResolvedMapping` for the given `mappings`, that can be a dict-like object (eg. an
+        :class:`taxi.aliases.AliasesDatabase`) or an iterable of `(alias, mapping)` tuples. The projects are fetched
+        from the database in a single pass and their status is only checked once, no matter how many aliases point to
+        them. Local aliases and aliases to inexistent projects get a `None` project and are not active.
+        """
+        if hasattr(mappings, 'items'):
+            mappings = mappings.items()
+
+        mappings = list(mappings)
+        # (id, backend) -> (project, is_active), with (id, None) pointing to the first project with that id in any
+        # backend, as with :meth:`get`
+        projects_by_key = {}
+        project_ids = list(set(mapping.mapping[0] for alias, mapping in mappings if mapping.is_mapped()))
+        connection = self.get_connection() if project_ids else None
+
+        if connection is not None:
+            # Stay below the maximum number of host parameters supported by SQLite
+            for i in range(0, len(project_ids), self.MAX_QUERY_PARAMETERS):
+                chunk = project_ids[i:i + self.MAX_QUERY_PARAMETERS]
+                rows = connection.execute(
+                    'SELECT id, backend, data FROM projects WHERE id IN (%s) ORDER BY position'
+                    % ', '.join(['?'] * len(chunk)), chunk
+                )
+
+                for (id, backend, data) in rows:
+                    keys = [key for key in ((id, backend), (id, None)) if key not in projects_by_key]
+
+                    if keys:
+                        project = load_project(json.loads(data))
+                        resolved_project = (project, project.is_active())
+
+                        for key in keys:
+                            projects_by_key[key] = resolved_project
+
+        resolved_mappings = []
 
-            for project in projects:
-                self._projects_by_id_cache[project.id].append(project)
+        for alias, mapping in mappings:
+            project, is_active, activity = None, False, None
 
-        for project in self._projects_by_id_cache.get(id, []):
-            if backend is None or project.backend == backend:
-                return project
+            if mapping.is_mapped() and (mapping.mapping[0], mapping.backend) in projects_by_key:
+                project, is_active = projects_by_key[(mapping.mapping[0], mapping.backend)]
 
-        return None
+                if mapping.mapping[1] is not None:
+                    activity = project.get_activity(mapping.mapping[1])
+
+            resolved_mappings.append(ResolvedMapping(alias, mapping, project, activity, is_active))
+
+        return resolved_mappings
 
     def mapping_to_project(self, mapping):
         project = self.get(mapping.mapping[0], mapping.backend)
@@ -241,58 +496,87 @@ class ProjectsDb:
         return (project, activity)
 
 
+def get_trigrams(text):
+    """
+    Return the set of 3-characters substrings of the given text.
+    """
+    return set(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def dump_project(project):
+    """
+    Return the given :class:`Project` as a dict that can be serialized to JSON.
+    """
+    project_dict = dict(project.__dict__)
+    project_dict.update((field, getattr(project, field)) for field in Project.FIELDS)
+
+    for date_type in ['start_date', 'end_date']:
+        if project_dict[date_type] is not None:
+            project_dict[date_type] = project_dict[date_type].isoformat()
+
+    project_dict['activities'] = [
+        dict(activity.__dict__, id=activity.id, name=activity.name, price=activity.price)
+        for activity in project.activities
+    ]
+
+    return project_dict
+
+
+def load_project(project_dict):
+    """
+    Return a :class:`Project` from the given dict, as returned by :func:`dump_project`.
+    """
+    project = Project(project_dict['id'], project_dict['name'])
+
+    for (field, value) in six.iteritems(project_dict):
+        if field != 'activities':
+            setattr(project, field, value)
+
+    for date_type in ['start_date', 'end_date']:
+        if project_dict.get(date_type) is not None:
+            setattr(project, date_type, datetime.datetime.strptime(project_dict[date_type], '%Y-%m-%d').date())
+
+    project.activities = [
+        Activity(activity['id'], activity['name'], activity['price'])
+        for activity in project_dict['activities']
+    ]
+
+    return project
+
+
 class LocalProjectsDb:
+    """
+    Legacy JSON projects db, only used to migrate existing databases.
+    """
     VERSION = 2
 
-    def __init__(self, projects=None):
+    def __init__(self, projects=None, sync_tokens=None):
         if not projects:
             projects = []
 
         self.projects = projects
+        self.sync_tokens = sync_tokens or {}
 
     def get_dump_object(self):
         return {
             'VERSION': self.VERSION,
             'projects': [
                 self.dump_project(project) for project in self.projects
-            ]
+            ],
+            'sync_tokens': self.sync_tokens,
         }
 
     def dump_project(self, project):
-        project_dict = copy.copy(project.__dict__)
-
-        for date_type in ['start_date', 'end_date']:
-            if project_dict[date_type] is not None:
-                project_dict[date_type] = project_dict[date_type].isoformat()
-
-        project_dict['activities'] = [
-            activity.__dict__ for activity in project_dict['activities']
-        ]
-
-        return project_dict
+        return dump_project(project)
 
 
 class LocalProjectsDbDecoder(json.JSONDecoder):
     def decode(self, s):
         s = super(LocalProjectsDbDecoder, self).decode(s)
 
-        projects = s['projects']
-        projects_copy = []
-        for project in projects:
-            project['activities'] = [
-                Activity(activity['id'], activity['name'], activity['price'])
-                for activity in project['activities']
-            ]
-            for date_type in ['start_date', 'end_date']:
-                if project[date_type] is not None:
-                    project[date_type] = datetime.datetime.strptime(
-                        project[date_type], '%Y-%m-%d').date()
-
-            p_copy = Project(project['id'], project['name'])
-            p_copy.__dict__.update(project)
-            projects_copy.append(p_copy)
-
-        lpdb = LocalProjectsDb(projects_copy)
+        projects_copy = [load_project(project) for project in s['projects']]
+
+        lpdb = LocalProjectsDb(projects_copy, s.get('sync_tokens'))
         lpdb.VERSION = s['VERSION']
 
         return lpdb
@@ -2,14 +2,19 @@
 from __future__ import unicode_literals
 
 from collections import defaultdict
+import codecs
 import copy
+import hashlib
+import json
 import os
 
+import six
 from six.moves import configparser
 
+from . import __version__
 from .aliases import Mapping
 from .projects import Project
-from .utils.file import expand_date as file_expand_date
+from .utils.file import expand_date as file_expand_date, write_file_atomically
 
 
 class StringSetting(object):
@@ -90,6 +95,7 @@ class Settings(object):
             'auto_add': StringSetting(default='auto',
                                       choices=AUTO_ADD_OPTIONS.values()),
             'nb_previous_files': IntegerSetting(default=1),
+            'nb_threads': IntegerSetting(default=1),
             'file': StringSetting(default='~/zebra/%Y/%m/%d.tks'),
             'editor': StringSetting(),
             'regroup_entries': BooleanSetting(default=True),
@@ -100,15 +106,38 @@ class Settings(object):
         }
     }
 
-    def __init__(self, file):
-        self.config = configparser.RawConfigParser(allow_no_value=True)
+    # Version of the snapshot format, see :meth:`load_snapshot`
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, file, snapshot_file=None, shared_aliases_db=None):
+        """
+        Load the settings from the configuration file `file`. If `snapshot_file` is set, the settings values, the
+        backends and the aliases are stored in this file after parsing the configuration file, and loaded from it
+        instead of parsing the configuration file as long as it doesn't change. The configuration file is then only
+        parsed when :attr:`config` is accessed, eg. to change settings.
+
+        If `shared_aliases_db` is set, it must be a :class:`~taxi.aliases.SharedAliasesDb` object in which the shared
+        aliases are stored instead of the configuration file.
+        """
+        self._config = None
         self.filepath = os.path.expanduser(file)
+        self.snapshot_file = snapshot_file
+        self.shared_aliases_db = shared_aliases_db
         self._settings = {}
+        self._snapshot = None
 
         try:
-            with open(self.filepath, 'r') as fp:
-                self.config.readfp(fp)
-        except IOError:
+            if snapshot_file:
+                # The signature is taken before parsing the configuration file
+                # so that a change made while parsing it invalidates the snapshot
+                signature = self.get_file_signature()
+                self._snapshot = self.load_snapshot(signature)
+
+            if self._snapshot is None:
+                raw_settings = self.get_raw_settings()
+            else:
+                raw_settings = self._snapshot['settings']
+        except (IOError, OSError):
             raise IOError(
                 "The specified configuration file `%s` doesn't exist" % file
             )
@@ -120,17 +149,116 @@ class Settings(object):
             for key, setting in settings.items():
                 self._settings[section][key] = copy.copy(setting)
 
+                if key not in raw_settings.get(section, {}):
+                    continue
+
+                value = raw_settings[section][key]
+
                 try:
-                    value = self.config.get(section, key)
                     self._settings[section][key].value = value
                 except ValueError:
                     raise ValueError(
                         "Value %s is not allowed for setting %s:%s" %
                         (value, section, key)
                     )
+
+        if snapshot_file and self._snapshot is None:
+            self.save_snapshot(signature)
+
+    @property
+    def config(self):
+        """
+        The :class:`RawConfigParser` object of the configuration file, which is parsed on first access.
+        """
+        if self._config is None:
+            config = configparser.RawConfigParser(allow_no_value=True)
+
+            with open(self.filepath, 'r') as fp:
+                config.readfp(fp)
+
+            self._config = config
+            # The configuration can now be modified and the snapshot would be
+            # outdated
+            self._snapshot = None
+
+        return self._config
+
+    def get_raw_settings(self):
+        """
+        Return a dict {section: {key: value}} of the settings defined in the configuration file, before their
+        conversion to Python values.
+        """
+        raw_settings = {}
+
+        for section, settings in self.SETTINGS.items():
+            raw_settings[section] = {}
+
+            for key in settings:
+                try:
+                    raw_settings[section][key] = self.config.get(section, key)
                 except (configparser.NoOptionError, configparser.NoSectionError):
                     pass
 
+        return raw_settings
+
+    def get_file_signature(self):
+        """
+        Return a dict identifying the current version of the configuration file.
+        """
+        file_stat = os.stat(self.filepath)
+
+        with open(self.filepath, 'rb') as fp:
+            file_hash = hashlib.sha1(fp.read()).hexdigest()
+
+        return {
+            'VERSION': self.SNAPSHOT_VERSION,
+            'taxi_version': __version__,
+            'path': os.path.abspath(self.filepath),
+            'mtime': getattr(file_stat, 'st_mtime_ns', file_stat.st_mtime),
+            'size': file_stat.st_size,
+            'hash': file_hash,
+        }
+
+    def load_snapshot(self, signature):
+        """
+        Return the contents of the snapshot file as a dict, or `None` if it doesn't exist or if it doesn't match the
+        given signature of the configuration file (see :meth:`get_file_signature`).
+        """
+        try:
+            with codecs.open(self.snapshot_file, 'r', 'utf-8') as snapshot_file:
+                snapshot = json.loads(snapshot_file.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get('signature') != signature:
+            return None
+
+        return snapshot
+
+    def save_snapshot(self, signature):
+        """
+        Store the settings values, the backends and the aliases in the snapshot file, under the given signature of the
+        configuration file, which must have been taken before it was parsed. Errors when writing the snapshot are
+        ignored, as are configuration errors, which will be raised when the faulty part of the configuration is used.
+        The snapshot file is only readable by its owner, since the backends URIs can contain credentials.
+        """
+        try:
+            snapshot = {
+                'signature': signature,
+                'settings': self.get_raw_settings(),
+                'backends': self.get_backends(),
+                'aliases': dict(
+                    (section, self.get_section_aliases(section))
+                    for backend, uri in self.get_backends()
+                    for section in (get_alias_section_name(backend, False), get_alias_section_name(backend, True))
+                ),
+                'needed_conversions': [conversion.__name__ for conversion in self.needed_conversions],
+            }
+
+            write_file_atomically(self.snapshot_file, json.dumps(snapshot), mode=0o600)
+        except (IOError, OSError, configparser.Error):
+            pass
+
     def __getitem__(self, key):
         return self.get(key)
 
@@ -147,6 +275,8 @@ class Settings(object):
                         Project.tuple_to_str(mapping.mapping) if mapping.mapping else None)
 
     def remove_aliases(self, aliases):
+        shared_aliases = []
+
         for alias, mapping in aliases:
             for shared_section in [False, True]:
                 backend_section = get_alias_section_name(mapping.backend,
@@ -154,6 +284,11 @@ class Settings(object):
                 if self.config.has_option(backend_section, alias):
                     self.config.remove_option(backend_section, alias)
                     break
+            else:
+                shared_aliases.append((alias, mapping))
+
+        if shared_aliases and self.shared_aliases_db is not None:
+            self.shared_aliases_db.remove_aliases(shared_aliases)
 
     def write_config(self):
         with open(self.filepath, 'w') as file:
@@ -170,26 +305,86 @@ class Settings(object):
         self.config.remove_section(get_alias_section_name(backend, True))
         self.config.add_section(get_alias_section_name(backend, True))
 
+    def update_shared_aliases(self, backends_aliases):
+        """
+        Replace the shared aliases of the backends given in the {backend: {alias: mapping}} `backends_aliases` dict.
+        Shared aliases found in the configuration file, where they were stored before being moved to the shared
+        aliases db, are moved to the shared aliases db. Return `True` if the configuration file was changed and needs
+        to be written.
+        """
+        if self.shared_aliases_db is None:
+            for backend, aliases in six.iteritems(backends_aliases):
+                self.clear_shared_aliases(backend)
+
+                for alias, mapping in six.iteritems(aliases):
+                    self.add_shared_alias(alias, mapping)
+
+            return True
+
+        backends_aliases = dict(backends_aliases)
+        config_changed = False
+
+        for backend, uri in self.get_backends():
+            section = get_alias_section_name(backend, True)
+
+            if self.config.has_section(section):
+                if backend not in backends_aliases:
+                    backends_aliases[backend] = dict(
+                        (alias, Mapping(mapping, backend)) for alias, mapping in self.get_section_aliases(section)
+                    )
+
+                self.config.remove_section(section)
+                config_changed = True
+
+        self.shared_aliases_db.update(backends_aliases)
+
+        return config_changed
+
     def get_aliases(self):
-        backends = self.get_backends()
+        """
+        Return a dict {alias: mapping} of the user-defined and shared aliases of all backends. Shared aliases take
+        precedence over user-defined aliases of the same backend, and aliases of a backend take precedence over the
+        ones of the previous backends.
+        """
+        shared_aliases = self.shared_aliases_db.get_aliases() if self.shared_aliases_db is not None else {}
         aliases = defaultdict(dict)
 
-        for (backend, uri) in backends:
+        for (backend, uri) in self.get_backends():
             for shared_section in [False, True]:
                 backend_aliases_section = get_alias_section_name(
                     backend, shared_section
                 )
 
-                if self.config.has_section(backend_aliases_section):
-                    for (alias, mapping) in self.config.items(backend_aliases_section):
-                        mapping = Project.str_to_tuple(mapping) if mapping is not None else None
-                        mapping_obj = Mapping(mapping, backend)
+                for (alias, mapping) in self.get_section_aliases(backend_aliases_section):
+                    aliases[alias] = Mapping(mapping, backend)
 
-                        aliases[alias] = mapping_obj
+            aliases.update(shared_aliases.get(backend, {}))
 
         return aliases
 
+    def get_section_aliases(self, section):
+        """
+        Return a list of `(alias, mapping)` tuples of the aliases defined in the given section of the configuration
+        file, `mapping` being a `(project_id, activity_id)` tuple, or `None` for aliases without mapping.
+        """
+        if self._snapshot is not None:
+            return [
+                (alias, tuple(mapping) if mapping is not None else None)
+                for alias, mapping in self._snapshot['aliases'].get(section, [])
+            ]
+
+        if not self.config.has_section(section):
+            return []
+
+        return [
+            (alias, Project.str_to_tuple(mapping) if mapping is not None else None)
+            for (alias, mapping) in self.config.items(section)
+        ]
+
     def get_backends(self):
+        if self._snapshot is not None:
+            return [tuple(backend) for backend in self._snapshot['backends']]
+
         return self.config.items('backends')
 
     def convert_to_4(self):
@@ -270,6 +465,9 @@ class Settings(object):
 
     @property
     def needed_conversions(self):
+        if self._snapshot is not None:
+            return [getattr(self, conversion) for conversion in self._snapshot['needed_conversions']]
+
         conversions = []
 
         if self.config.has_option('default', 'local_aliases'):
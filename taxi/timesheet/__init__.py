@@ -3,3 +3,4 @@ from .lines import TextLine, DateLine
 from .entry import Entry, EntriesCollection
 from .parser import TimesheetParser, create_time_from_text, is_top_down, trim
 from .timesheet import Timesheet, TimesheetCollection
+from .cache import TimesheetCache
@@ -0,0 +1,157 @@
+from __future__ import unicode_literals
+
+import codecs
+import datetime
+import hashlib
+import json
+import os
+
+from .. import __version__
+from ..utils.file import write_file_atomically
+from .entry import Entry
+from .lines import DateLine, TextLine
+
+
+class TimesheetCache(object):
+    """
+    On-disk cache of parsed timesheets, stored in the directory `path`. Each timesheet file gets its own cache file
+    containing a serialized form of its lines. A cache entry is only considered valid if the modification time, the
+    size and the hash of the contents of the timesheet file are the same as when the entry was stored, and if the
+    parser configuration didn't change. The cache files of timesheets that don't exist anymore are removed when a new
+    cache file is created, see :meth:`prune`. Cache files are only readable by their owner, since they contain the
+    contents of the timesheets.
+    """
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+
+    def get_cache_file_path(self, file_path):
+        """
+        Return the path of the cache file for the timesheet file located in `file_path`.
+        """
+        file_hash = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+
+        return os.path.join(self.path, file_hash + '.json')
+
+    def get_file_signature(self, file_path, contents, parser):
+        """
+        Return a dict identifying the given version (`contents`) of the timesheet file located in `file_path`, parsed
+        with `parser`.
+        """
+        file_stat = os.stat(file_path)
+
+        return {
+            'VERSION': self.VERSION,
+            'taxi_version': __version__,
+            'path': os.path.abspath(file_path),
+            'mtime': getattr(file_stat, 'st_mtime_ns', file_stat.st_mtime),
+            'size': file_stat.st_size,
+            'hash': hashlib.sha1(contents.encode('utf-8')).hexdigest(),
+            'parser': [parser.entry_line_regexp] + sorted('%s=%s' % flag for flag in parser.flags_repr.items()),
+        }
+
+    def get(self, file_path, contents, parser):
+        """
+        Return the cached lines of the timesheet file located in `file_path`, or `None` if the cache doesn't contain
+        a valid entry for the given `contents` and `parser`.
+        """
+        try:
+            signature = self.get_file_signature(file_path, contents, parser)
+
+            with codecs.open(self.get_cache_file_path(file_path), 'r', 'utf-8') as cache_file:
+                cache = json.loads(cache_file.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+        if cache.get('signature') != signature:
+            return None
+
+        try:
+            return [self.decode_line(line) for line in cache['lines']]
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+    def set(self, file_path, contents, parser, lines):
+        """
+        Store the given `lines`, parsed from the `contents` of the timesheet file located in `file_path`. Errors when
+        writing the cache are ignored.
+        """
+        cache_file_path = self.get_cache_file_path(file_path)
+
+        try:
+            cache = {
+                'signature': self.get_file_signature(file_path, contents, parser),
+                'lines': [self.encode_line(line) for line in lines],
+            }
+            is_new_cache_file = not os.path.exists(cache_file_path)
+
+            write_file_atomically(cache_file_path, json.dumps(cache), mode=0o600)
+        except (IOError, OSError):
+            return
+
+        # New cache files are created when timesheets are added, which is
+        # also when old timesheets usually get removed or moved
+        if is_new_cache_file:
+            self.prune()
+
+    def prune(self):
+        """
+        Remove the cache files of the timesheet files that don't exist anymore, and the cache files that can't be
+        read. Errors when removing cache files are ignored.
+        """
+        try:
+            cache_file_names = os.listdir(self.path)
+        except OSError:
+            return
+
+        for cache_file_name in cache_file_names:
+            # Skip the temporary files of the cache files being written
+            if not cache_file_name.endswith('.json') or cache_file_name.startswith('.'):
+                continue
+
+            cache_file_path = os.path.join(self.path, cache_file_name)
+
+            try:
+                with codecs.open(cache_file_path, 'r', 'utf-8') as cache_file:
+                    timesheet_file_path = json.loads(cache_file.read())['signature']['path']
+            except (IOError, OSError, ValueError, KeyError, TypeError):
+                timesheet_file_path = None
+
+            try:
+                if timesheet_file_path is None or not os.path.exists(timesheet_file_path):
+                    os.remove(cache_file_path)
+            except OSError:
+                pass
+
+    def encode_line(self, line):
+        """
+        Return a JSON-serializable representation of the given line.
+        """
+        if isinstance(line, TextLine):
+            return ['t', line.text]
+        elif isinstance(line, DateLine):
+            return ['d', line.date.toordinal(), line._text]
+
+        if isinstance(line.duration, tuple):
+            duration = [(time.hour, time.minute) if time is not None else None for time in line.duration]
+        else:
+            duration = line.duration
+
+        return ['e', line.alias, duration, line.description, sorted(line.flags), line._text]
+
+    def decode_line(self, line):
+        """
+        Return the line object corresponding to the given representation, as returned by :meth:`encode_line`.
+        """
+        if line[0] == 't':
+            return TextLine(line[1])
+        elif line[0] == 'd':
+            return DateLine(datetime.date.fromordinal(line[1]), line[2])
+
+        alias, duration, description, flags, text = line[1:]
+
+        if isinstance(duration, list):
+            duration = tuple(datetime.time(*time) if time is not None else None for time in duration)
+
+        return Entry(alias, duration, description, flags=set(flags), text=tuple(text) if text else text)
@@ -1,8 +1,12 @@
 from __future__ import unicode_literals
 
+import array
+import bisect
 import collections
 import copy
 import datetime
+import itertools
+import weakref
 
 import six
 
@@ -10,7 +14,7 @@ from ..aliases import aliases_database
 from ..utils import date as date_utils
 from .flags import FlaggableMixin
 from .lines import DateLine, TextLine
-from .utils import is_top_down, trim
+from .utils import is_empty_text_line, is_top_down
 
 
 def synchronized(func):
@@ -25,6 +29,127 @@ def synchronized(func):
     return wrapper
 
 
+def iter_date_entries(lines):
+    """
+    Yield a `(date, entry)` tuple for each entry of the given iterable of line objects (as returned by
+    :meth:`~taxi.timesheet.parser.TimesheetParser.iter_lines`), linking the entries of a date together like
+    :class:`EntriesCollection` does, so that their duration can be computed.
+    """
+    current_date = previous_entry = None
+
+    for line in lines:
+        if isinstance(line, DateLine):
+            current_date = line.date
+            previous_entry = None
+        elif isinstance(line, Entry):
+            line.previous_entry = previous_entry
+            line.next_entry = None
+
+            if previous_entry is not None:
+                previous_entry.next_entry = line
+
+            previous_entry = line
+
+            yield (current_date, line)
+
+
+def iter_filtered_entries(date_entries, date=None, ignored=None, pushed=None, unmapped=None, current_workday=None):
+    """
+    Yield the `(date, entry)` tuples from the given `date_entries` iterable that match the given criteria, as they
+    come. See :meth:`EntriesCollection.filter` for the meaning of the criteria.
+    """
+    # Date can either be a single date (only 1 day) or a tuple for a
+    # date range
+    if date is not None and not isinstance(date, tuple):
+        date = (date, date)
+
+    if current_workday is not None:
+        today = datetime.date.today()
+        yesterday = date_utils.get_previous_working_day(today)
+
+    for (entry_date, entry) in date_entries:
+        if (date is not None and (
+                (date[0] is not None and entry_date < date[0])
+                or (date[1] is not None and entry_date > date[1]))):
+            continue
+
+        if ignored is not None and entry.ignored != ignored:
+            continue
+
+        if pushed is not None and entry.pushed != pushed:
+            continue
+
+        if unmapped is not None and entry.mapped == unmapped:
+            continue
+
+        if current_workday is not None:
+            is_current_workday = entry_date in (today, yesterday) and entry_date.strftime('%w') not in [6, 0]
+
+            if current_workday != is_current_workday:
+                continue
+
+        yield (entry_date, entry)
+
+
+def group_entries(date_entries, regroup=False):
+    """
+    Return the given iterable of `(date, entry)` tuples as a dict of {:class:`datetime.date`: list of
+    :class:`~taxi.timesheet.lines.Entry`} items. If `regroup` is set to True, similar entries of a date are regrouped
+    into a single :class:`~taxi.timesheet.entry.AggregatedTimesheetEntry`.
+    """
+    grouped_entries = collections.defaultdict(list)
+
+    for (entry_date, entry) in date_entries:
+        grouped_entries[entry_date].append(entry)
+
+    if regroup:
+        for (entry_date, entries) in six.iteritems(grouped_entries):
+            grouped_entries[entry_date] = regroup_entries(entries)
+
+    return grouped_entries
+
+
+def regroup_entries(entries):
+    """
+    Return a list of the given entries where similar entries (ie. having the same
+    :meth:`~taxi.timesheet.lines.Entry.hash`) are regrouped into a single
+    :class:`~taxi.timesheet.entry.AggregatedTimesheetEntry`.
+    """
+    regrouped_entries = []
+    # This is a mapping between entries hashes and their position in the
+    # regrouped_entries list
+    aggregated_entries = {}
+
+    for entry in entries:
+        # Common case: the entry is not yet referenced in the
+        # aggregated_entries dict
+        if entry.hash not in aggregated_entries:
+            # In that case, put it normally in the regrouped_entries list. It
+            # will get replaced by an AggregatedEntry later if necessary
+            aggregated_entries[entry.hash] = len(regrouped_entries)
+            regrouped_entries.append(entry)
+        else:
+            # Get the first occurence of the entry in the regrouped_entries
+            # list
+            existing_entry = regrouped_entries[aggregated_entries[entry.hash]]
+
+            # The entry could already have been replaced by an
+            # AggregatedEntry if there's more than 2 occurences
+            if isinstance(existing_entry, Entry):
+                # Create the AggregatedEntry, put the first occurence of
+                # Entry in it and the current one
+                aggregated_entry = AggregatedTimesheetEntry()
+                aggregated_entry.entries.append(existing_entry)
+                aggregated_entry.entries.append(entry)
+                regrouped_entries[aggregated_entries[entry.hash]] = aggregated_entry
+            else:
+                # The entry we found is already an AggregatedEntry, let's
+                # just append the current entry to it
+                existing_entry.entries.append(entry)
+
+    return regrouped_entries
+
+
 class Entry(FlaggableMixin):
     """
     The Entry is a line representing a timesheet entry, with an alias, a
@@ -32,6 +157,11 @@ class Entry(FlaggableMixin):
     """
     FLAG_IGNORED = 'ignored'
     FLAG_PUSHED = 'pushed'
+    # Set of the attributes that changed since the initialization, see `__setattr__`
+    _changed_attrs = None
+    # Weak references to the `EntriesIndex` objects this entry is part of, so
+    # that they can be updated when its alias or its flags change
+    _indexes = ()
 
     def __init__(self, alias, duration, description, flags=None, text=None):
         """
@@ -75,11 +205,14 @@ class Entry(FlaggableMixin):
         Set the given `attr` to the given `value` and memorize this attribute
         has changed so we can regenerate it when outputting text.
         """
-        if hasattr(self, '_changed_attrs') and attr != '_changed_attrs':
+        if self._changed_attrs is not None and attr != '_changed_attrs':
             self._changed_attrs.add(attr)
 
         super(Entry, self).__setattr__(attr, value)
 
+        if attr == 'alias':
+            self.update_indexes()
+
     @property
     def hours(self):
         """
@@ -163,6 +296,7 @@ class Entry(FlaggableMixin):
         """
         super(Entry, self).add_flag(flag)
         self._changed_attrs.add('flags')
+        self.update_indexes()
 
     def remove_flag(self, flag):
         """
@@ -171,6 +305,17 @@ class Entry(FlaggableMixin):
         """
         super(Entry, self).remove_flag(flag)
         self._changed_attrs.add('flags')
+        self.update_indexes()
+
+    def update_indexes(self):
+        """
+        Update the alias and flags of the entry in the indexes it's part of.
+        """
+        for index_ref in self._indexes:
+            index = index_ref()
+
+            if index is not None:
+                index.update(self)
 
     @property
     def flags(self):
@@ -222,6 +367,363 @@ class Entry(FlaggableMixin):
         self._add_or_remove_flag(self.FLAG_IGNORED, value)
 
 
+class LinesBlock(object):
+    """
+    A block of lines starting with a :class:`~taxi.timesheet.lines.DateLine` and containing all the lines up to the
+    next date line. Blocks are chained together (see :attr:`previous` and :attr:`next`) to form a
+    :class:`BlockList`.
+    """
+    def __init__(self, date_line, lines=None):
+        self.date_line = date_line
+        self.lines = lines if lines is not None else []
+        self.previous = None
+        self.next = None
+
+
+class BlockList(object):
+    """
+    Textual representation of an entries collection. Lines are stored as a header (the lines before the first date)
+    followed by a linked list of :class:`LinesBlock`, indexed by date and by entry. This allows to add entries, add
+    dates and delete dates or entries by only touching the blocks involved instead of going through all the lines.
+
+    Iterating over a block list yields all its lines in order.
+    """
+    def __init__(self, lines=None):
+        self.header = []
+        self.first = None
+        self.last = None
+        # Mapping between dates and the blocks of these dates, in the order they appear in the lines
+        self.blocks_by_date = {}
+        # Mapping between entries and the block they're in, or `None` if they're in the header
+        self.entries_blocks = {}
+
+        if lines:
+            for line in lines:
+                self.append(line)
+
+    def __iter__(self):
+        for line in self.header:
+            yield line
+
+        block = self.first
+        while block is not None:
+            yield block.date_line
+
+            for line in block.lines:
+                yield line
+
+            block = block.next
+
+    def _get_block_lines(self, block):
+        """
+        Return the list of lines of the given `block`, or the header if `block` is `None`.
+        """
+        return block.lines if block is not None else self.header
+
+    def _insert_block(self, block, first=False):
+        """
+        Link the given `block` to the start of the list if `first` is set, to the end otherwise.
+        """
+        blocks = self.blocks_by_date.setdefault(block.date_line.date, [])
+
+        if first:
+            block.next = self.first
+            if self.first is not None:
+                self.first.previous = block
+            self.first = block
+            blocks.insert(0, block)
+        else:
+            block.previous = self.last
+            if self.last is not None:
+                self.last.next = block
+            self.last = block
+            blocks.append(block)
+
+        if self.last is None:
+            self.last = block
+        if self.first is None:
+            self.first = block
+
+    def _remove_block(self, block):
+        """
+        Unlink the given `block`, its lines (apart from the date line) being moved to the previous block.
+        """
+        previous_lines = self._get_block_lines(block.previous)
+        previous_lines.extend(block.lines)
+
+        for line in block.lines:
+            if isinstance(line, Entry):
+                self.entries_blocks[line] = block.previous
+
+        if block.previous is not None:
+            block.previous.next = block.next
+        else:
+            self.first = block.next
+
+        if block.next is not None:
+            block.next.previous = block.previous
+        else:
+            self.last = block.previous
+
+    def append(self, line):
+        """
+        Add the given `line` at the end of the lines.
+        """
+        if isinstance(line, DateLine):
+            self._insert_block(LinesBlock(line))
+        else:
+            if isinstance(line, Entry):
+                self.entries_blocks[line] = self.last
+
+            self._get_block_lines(self.last).append(line)
+
+    def date_lines(self):
+        """
+        Iterate over the date lines, in the order they appear in the lines.
+        """
+        block = self.first
+        while block is not None:
+            yield block.date_line
+            block = block.next
+
+    def add_entry(self, date, entry):
+        """
+        Insert the given `entry` after the last entry of the given `date`, or right after the date line (separated by
+        a blank line) if the date doesn't have any entry yet.
+        """
+        blocks = self.blocks_by_date.get(date)
+
+        # The date doesn't exist in the lines, so insert the entry at the top
+        if not blocks:
+            lines = list(self)
+            lines.insert(1, entry)
+
+            if not isinstance(lines[0], Entry):
+                lines.insert(1, TextLine(''))
+
+            self.__init__(lines)
+            return
+
+        block = blocks[0]
+        insert_block = block
+        insert_at = None
+
+        # Consecutive date lines of the same date are considered as a single date
+        while True:
+            for (position, line) in enumerate(block.lines):
+                if isinstance(line, Entry):
+                    insert_block, insert_at = block, position
+
+            if block.next is None or block.next.date_line.date != date:
+                break
+
+            block = block.next
+            insert_block, insert_at = block, None
+
+        if insert_at is None:
+            insert_block.lines[0:0] = [TextLine(''), entry]
+        else:
+            insert_block.lines.insert(insert_at + 1, entry)
+
+        self.entries_blocks[entry] = insert_block
+
+    def delete_entries(self, entries):
+        """
+        Remove the given entries from the lines and trim them. Each block containing some of the entries is rebuilt
+        only once, no matter how many of its entries are deleted.
+        """
+        entries_ids_by_block = {}
+
+        for entry in entries:
+            if entry not in self.entries_blocks:
+                continue
+
+            block = self.entries_blocks.pop(entry)
+            entries_ids_by_block.setdefault(block, set()).add(id(entry))
+
+        for block, entries_ids in entries_ids_by_block.items():
+            block_lines = self._get_block_lines(block)
+            block_lines[:] = [line for line in block_lines if id(line) not in entries_ids]
+
+        self.trim()
+
+    def add_date(self, date, add_date_to_bottom):
+        """
+        Add a date line for the given `date` to the bottom of the lines if `add_date_to_bottom` is set, to the top
+        otherwise.
+        """
+        self.trim()
+        block = LinesBlock(DateLine(date))
+
+        if add_date_to_bottom:
+            if self.header or self.first is not None:
+                self._get_block_lines(self.last).append(TextLine(''))
+
+            self._insert_block(block)
+        else:
+            # The lines that were before the first date now belong to the new date
+            block.lines = [TextLine('')] + self.header
+            self.header = []
+
+            for line in block.lines:
+                if isinstance(line, Entry):
+                    self.entries_blocks[line] = block
+
+            self._insert_block(block, first=True)
+
+        self.trim()
+
+    def delete_dates(self, dates):
+        """
+        Remove the date lines of the given `dates` and trim the lines. This doesn't remove any entry line.
+        """
+        for date in dates:
+            for block in self.blocks_by_date.pop(date, []):
+                self._remove_block(block)
+
+        self.trim()
+
+    def trim(self):
+        """
+        Remove the empty text lines at the start and at the end of the lines. See
+        :func:`~taxi.timesheet.utils.trim`.
+        """
+        nb_empty_lines = 0
+        for line in self.header:
+            if not is_empty_text_line(line):
+                break
+            nb_empty_lines += 1
+
+        del self.header[:nb_empty_lines]
+
+        last_lines = self._get_block_lines(self.last)
+        while last_lines and is_empty_text_line(last_lines[-1]):
+            last_lines.pop()
+
+
+class EntriesIndex(object):
+    """
+    Secondary indexes of the entries of an :class:`EntriesCollection`, by alias and by flag. Each entry gets a
+    sequence number, and each index is a bitset (stored in an integer) of the sequence numbers of the matching entries,
+    so that indexes can be intersected without going through the entries. The entries notify the indexes they're part
+    of when their alias or their flags change, see :meth:`Entry.update_indexes`.
+    """
+    def __init__(self, date_entries=()):
+        """
+        Create the index of the given iterable of `(date, entry)` tuples.
+        """
+        # Entry -> (sequence number, date, alias, flags) of the entry when it
+        # was indexed
+        self.entries = {}
+        self.entries_by_seq = {}
+        self.next_seq = 0
+        aliases_seqs = collections.defaultdict(list)
+        flags_seqs = collections.defaultdict(list)
+
+        for (entry_date, entry) in date_entries:
+            seq = self._register(entry_date, entry)
+            aliases_seqs[entry.alias].append(seq)
+
+            for flag in entry._flags:
+                flags_seqs[flag].append(seq)
+
+        # Setting the bits one by one would make building the index quadratic
+        self.all = (1 << self.next_seq) - 1
+        self.aliases = dict((alias, get_bitset(seqs)) for alias, seqs in six.iteritems(aliases_seqs))
+        self.flags = dict((flag, get_bitset(seqs)) for flag, seqs in six.iteritems(flags_seqs))
+
+    def _register(self, entry_date, entry):
+        seq = self.next_seq
+        self.next_seq += 1
+        self.entries[entry] = (seq, entry_date, entry.alias, frozenset(entry._flags))
+        self.entries_by_seq[seq] = entry
+
+        entry._indexes = [
+            index_ref for index_ref in entry._indexes if index_ref() not in (None, self)
+        ] + [weakref.ref(self)]
+
+        return seq
+
+    def _set_bits(self, seq, alias, flags, value):
+        bit = 1 << seq
+
+        for (bitsets, key) in [(self.aliases, alias)] + [(self.flags, flag) for flag in flags]:
+            bitset = bitsets.get(key, 0) | bit if value else bitsets.get(key, 0) & ~bit
+
+            if bitset:
+                bitsets[key] = bitset
+            else:
+                bitsets.pop(key, None)
+
+    def add(self, entry_date, entry):
+        if entry in self.entries:
+            self.remove(entry)
+
+        seq = self._register(entry_date, entry)
+        self.all |= 1 << seq
+        self._set_bits(seq, entry.alias, entry._flags, True)
+
+    def remove(self, entry):
+        if entry not in self.entries:
+            return
+
+        seq, entry_date, alias, flags = self.entries.pop(entry)
+        del self.entries_by_seq[seq]
+        self.all &= ~(1 << seq)
+        self._set_bits(seq, alias, flags, False)
+
+    def update(self, entry):
+        """
+        Update the alias and flags of the given entry in the index.
+        """
+        if entry not in self.entries:
+            return
+
+        seq, entry_date, alias, flags = self.entries[entry]
+        self._set_bits(seq, alias, flags, False)
+        self._set_bits(seq, entry.alias, entry._flags, True)
+        self.entries[entry] = (seq, entry_date, entry.alias, frozenset(entry._flags))
+
+    def iter_entries(self, bitset):
+        """
+        Yield the `(date, entry)` tuples of the entries of the given bitset, in the order they were indexed.
+        """
+        for seq in iter_bitset(bitset):
+            entry = self.entries_by_seq[seq]
+
+            yield (self.entries[entry][1], entry)
+
+
+def get_bitset(positions):
+    """
+    Return an integer with the bits of the given positions set.
+    """
+    positions = list(positions)
+
+    if not positions:
+        return 0
+
+    bits = ['0'] * (max(positions) + 1)
+    for position in positions:
+        bits[position] = '1'
+
+    return int(''.join(reversed(bits)), 2)
+
+
+def iter_bitset(bitset):
+    """
+    Yield the positions of the bits set in the given integer, in increasing order.
+    """
+    # Searching the binary representation only runs Python code for the bits
+    # that are set
+    bits = bin(bitset)[:1:-1]
+    position = bits.find('1')
+
+    while position != -1:
+        yield position
+        position = bits.find('1', position + 1)
+
+
 class EntriesCollection(collections.defaultdict):
     """
     An entries collection is a subclass of defaultdict, with dates as keys and
@@ -233,10 +735,22 @@ class EntriesCollection(collections.defaultdict):
     of automatically synchronizing the textual representation with the
     structured data.
     """
-    def __init__(self, parser, entries=None):
+    def __init__(self, parser, entries=None, lines=None):
+        """
+        `entries` is an optional string to initialize the collection with. If
+        `lines` is set, it must be a list of lines as returned by
+        :meth:`~taxi.timesheet.parser.TimesheetParser.parse_text` and it will
+        be used instead of parsing `entries`.
+        """
         super(EntriesCollection, self).__init__(EntriesList)
 
-        self.lines = []
+        # Sorted ordinals of the dates of the collection, used to find the
+        # dates of a range without going through all of them
+        self._date_ordinals = array.array('l')
+        # Index of the entries by alias and by flag, built on the first query,
+        # see `get_entries_index`
+        self._entries_index = None
+        self.block_list = BlockList()
         self.parser = parser
         # This flag allows to enable/disable synchronization with the internal
         # text representation, useful when building the initial structure from
@@ -245,11 +759,14 @@ class EntriesCollection(collections.defaultdict):
 
         # If there are initial entries to import, disable synchronization and
         # import them in the structure
-        if entries:
+        if entries or lines:
             self.synchronized = False
 
             try:
-                self.init_from_str(entries)
+                if lines is not None:
+                    self.init_from_lines(lines)
+                else:
+                    self.init_from_str(entries)
             finally:
                 self.synchronized = True
 
@@ -273,11 +790,7 @@ class EntriesCollection(collections.defaultdict):
         If in synchronized mode, delete the date and its entries from the
         textual representation.
         """
-        if self.synchronized:
-            self.delete_entries(self[key])
-            self.delete_date(key)
-
-        super(EntriesCollection, self).__delitem__(key)
+        self.delete_dates_entries([key])
 
     def __setitem__(self, key, value):
         """
@@ -294,12 +807,32 @@ class EntriesCollection(collections.defaultdict):
             value = self.default_factory(self, key)
 
         super(EntriesCollection, self).__setitem__(key, value)
+        bisect.insort(self._date_ordinals, key.toordinal())
+
+        for entry in value:
+            self.index_entry(key, entry)
 
         if self.synchronized:
             self.add_date(key)
             for entry in value:
                 self.add_entry(entry)
 
+    @classmethod
+    def merge(cls, parser, entries_collections):
+        """
+        Return a new entries collection containing the entries of all the given `entries_collections`, built in a
+        single pass. The returned collection is not synchronized with any textual representation (its lines are
+        empty), so it should only be used for reading and filtering entries.
+        """
+        merged_collection = cls(parser)
+        merged_collection.synchronized = False
+
+        for entries_collection in entries_collections:
+            for entries_date, entries in six.iteritems(entries_collection):
+                merged_collection[entries_date].extend(entries)
+
+        return merged_collection
+
     def __add__(self, other):
         new_collection = EntriesCollection(parser=self.parser)
 
@@ -310,37 +843,27 @@ class EntriesCollection(collections.defaultdict):
 
         return new_collection
 
+    @property
+    def lines(self):
+        """
+        Return the list of lines of the textual representation. The returned list is a copy: changing it won't change
+        the textual representation.
+        """
+        return list(self.block_list)
+
+    @lines.setter
+    def lines(self, lines):
+        self.block_list = BlockList(lines)
+
     def is_top_down(self):
-        return is_top_down(self.lines)
+        return is_top_down(list(itertools.islice(self.block_list.date_lines(), 2)))
 
     @synchronized
     def add_entry(self, date, entry):
         """
         Add the given entry to the textual representation.
         """
-        in_date = False
-        insert_at = 0
-
-        for (lineno, line) in enumerate(self.lines):
-            # Search for the date of the entry
-            if isinstance(line, DateLine) and line.date == date:
-                in_date = True
-                # Insert here if there is no existing Entry for this date
-                insert_at = lineno
-                continue
-
-            if in_date:
-                if isinstance(line, Entry):
-                    insert_at = lineno
-                elif isinstance(line, DateLine):
-                    break
-
-        self.lines.insert(insert_at + 1, entry)
-
-        # If there's no other Entry in the current date, add a blank line
-        # between the date and the entry
-        if not isinstance(self.lines[insert_at], Entry):
-            self.lines.insert(insert_at + 1, TextLine(''))
+        self.block_list.add_entry(date, entry)
 
     def delete_entry(self, entry):
         """
@@ -351,35 +874,90 @@ class EntriesCollection(collections.defaultdict):
     @synchronized
     def delete_entries(self, entries):
         """
-        Remove the given entries from the textual representation.
+        Remove the given entries from the textual representation. Entries are
+        matched by identity and all of them are removed in a single pass.
         """
-        self.lines = trim([
-            line for line in self.lines
-            if not isinstance(line, Entry) or line not in entries
-        ])
+        self.block_list.delete_entries(entries)
 
     def add(self, date, entry):
         self[date].append(entry)
 
-    @synchronized
     def delete_date(self, date):
         """
         Remove the date line from the textual representation. This doesn't
         remove any entry line.
         """
-        self.lines = [
-            line for line in self.lines
-            if not isinstance(line, DateLine) or line.date != date
-        ]
+        self.delete_dates([date])
+
+    @synchronized
+    def delete_dates(self, dates):
+        """
+        Remove the date lines of the given dates from the textual
+        representation. This doesn't remove any entry line.
+        """
+        self.block_list.delete_dates(dates)
+
+    def delete_dates_entries(self, dates):
+        """
+        Delete the given dates and all their entries from the collection. If in
+        synchronized mode, the textual representation is updated in a single
+        pass, no matter how many dates are deleted. Dates given several times
+        are only deleted once.
+        """
+        dates = list(collections.OrderedDict.fromkeys(dates))
+
+        if self.synchronized:
+            self.delete_entries([entry for date in dates for entry in self[date]])
+            self.delete_dates(dates)
+
+        for date in dates:
+            self.unindex_entries(self[date])
+            super(EntriesCollection, self).__delitem__(date)
+
+            # Dates added with `update` are not indexed, see `get_dates`
+            i = bisect.bisect_left(self._date_ordinals, date.toordinal())
+            if i < len(self._date_ordinals) and self._date_ordinals[i] == date.toordinal():
+                del self._date_ordinals[i]
+
+    def index_entry(self, date, entry):
+        """
+        Add the given entry to the index of the entries, if it has been built.
+        """
+        if self._entries_index is not None:
+            self._entries_index.add(date, entry)
+
+    def unindex_entries(self, entries):
+        """
+        Remove the given entries from the index of the entries, if it has been built.
+        """
+        if self._entries_index is not None:
+            for entry in entries:
+                self._entries_index.remove(entry)
+
+    def get_entries_index(self):
+        """
+        Return the :class:`EntriesIndex` of the entries of the collection, building it if needed. Once built, the index
+        is kept up to date when entries are added or removed, and when their alias or their flags change.
+        """
+        if self._entries_index is None:
+            self._entries_index = EntriesIndex(
+                (entries_date, entry) for entries_date, entries in six.iteritems(self) for entry in entries
+            )
 
-        self.lines = trim(self.lines)
+        return self._entries_index
 
     @synchronized
     def add_date(self, date):
         """
-        Add the given date to the textual representation.
+        Add the given date to the textual representation, at the top or at the bottom depending on the
+        `add_date_to_bottom` attribute of the parser.
         """
-        self.lines = self.parser.add_date(date, self.lines)
+        add_date_to_bottom = self.parser.add_date_to_bottom
+
+        if add_date_to_bottom is None:
+            add_date_to_bottom = self.is_top_down()
+
+        self.block_list.add_date(date, add_date_to_bottom)
 
     def init_from_str(self, entries):
         """
@@ -388,13 +966,25 @@ class EntriesCollection(collections.defaultdict):
         this string, refer to the
         :func:`~taxi.timesheet.parser.parse_text` function.
         """
-        self.lines = self.parser.parse_text(entries)
+        self.init_from_lines(self.parser.parse_text(entries))
 
-        for line in self.lines:
+    def init_from_lines(self, lines):
+        """
+        Initialize the structured and textual data based on a list of lines,
+        as returned by :func:`~taxi.timesheet.parser.parse_text`.
+        """
+        self.lines = lines
+
+        for line in lines:
             if isinstance(line, DateLine):
                 current_date = line.date
                 self[current_date] = self.default_factory(self, line.date)
             elif isinstance(line, Entry):
+                # Lines can be reused from a previous parsing (see
+                # `TimesheetParser.reparse_text`), so their links to other
+                # entries need to be reset
+                line.previous_entry = line.next_entry = None
+
                 if len(self[current_date]) > 0:
                     line.previous_entry = self[current_date][-1]
                     self[current_date][-1].next_entry = line
@@ -406,7 +996,7 @@ class EntriesCollection(collections.defaultdict):
         Return a list of strings, each string being a line of the entries
         collection (dates, entries and text).
         """
-        return [self.parser.to_text(line) for line in self.lines]
+        return [self.parser.to_text(line) for line in self.block_list]
 
     def filter(self, date=None, regroup=False, ignored=None, pushed=None, unmapped=None, current_workday=None):
         """
@@ -420,97 +1010,88 @@ class EntriesCollection(collections.defaultdict):
         :meth:`~taxi.timesheet.lines.Entry.hash`) will be regrouped intro a single
         :class:`~taxi.timesheet.entry.AggregatedTimesheetEntry`.
         """
-        def entry_filter(entry_date, entry):
-            if ignored is not None and entry.ignored != ignored:
-                return False
+        if ignored is not None or pushed is not None or unmapped is not None:
+            # The index narrows down the entries much more than the dates,
+            # especially when looking for entries that are not pushed yet
+            date_entries = self.query(ignored, pushed, unmapped)
+        else:
+            if date is None:
+                dates = self.keys()
+            elif isinstance(date, tuple):
+                dates = self.get_dates(*date)
+            else:
+                dates = self.get_dates(date, date)
 
-            if pushed is not None and entry.pushed != pushed:
-                return False
+            date_entries = (
+                (entries_date, entry) for entries_date in dates for entry in self[entries_date]
+            )
+            date = None
 
-            if unmapped is not None and entry.mapped == unmapped:
-                return False
+        return group_entries(iter_filtered_entries(date_entries, date, current_workday=current_workday), regroup)
 
-            if current_workday is not None:
-                today = datetime.date.today()
-                yesterday = date_utils.get_previous_working_day(today)
-                is_current_workday = entry_date in (today, yesterday) and entry_date.strftime('%w') not in [6, 0]
+    def query(self, ignored=None, pushed=None, unmapped=None):
+        """
+        Return the list of `(date, entry)` tuples of the entries that match the given criteria, sorted by date. See
+        :meth:`filter` for the meaning of the criteria. The criteria are resolved with the index of the entries (see
+        :meth:`get_entries_index`), so only the entries that match the flags and aliases criteria are looked at.
+        """
+        index = self.get_entries_index()
+        bitset = index.all
 
-                if current_workday != is_current_workday:
-                    return False
+        if pushed is not None:
+            pushed_bitset = index.flags.get(Entry.FLAG_PUSHED, 0)
+            bitset &= pushed_bitset if pushed else ~pushed_bitset
 
-            return True
+        if unmapped is not None:
+            aliases_bitset = 0
 
-        # Date can either be a single date (only 1 day) or a tuple for a
-        # date range
-        if date is not None and not isinstance(date, tuple):
-            date = (date, date)
+            for alias, alias_bitset in six.iteritems(index.aliases):
+                if (alias in aliases_database) != unmapped:
+                    aliases_bitset |= alias_bitset
 
-        filtered_entries = collections.defaultdict(list)
+            bitset &= aliases_bitset
 
-        for (entries_date, entries) in six.iteritems(self):
-            if (date is not None and (
-                    (date[0] is not None and entries_date < date[0])
-                    or (date[1] is not None and entries_date > date[1]))):
-                continue
+        # Entries can also be ignored because of their duration, so the flag
+        # can only be used to exclude entries
+        if ignored is False:
+            bitset &= ~index.flags.get(Entry.FLAG_IGNORED, 0)
 
-            entries_for_date = []
+        date_entries = index.iter_entries(bitset)
 
-            if regroup:
-                # This is a mapping between entries hashes and their
-                # position in the entries_for_date list
-                aggregated_entries = {}
-                id = 0
+        if ignored is not None:
+            date_entries = ((entries_date, entry) for (entries_date, entry) in date_entries if entry.ignored == ignored)
 
-                for entry in entries:
-                    if not entry_filter(entries_date, entry):
-                        continue
-
-                    # Common case: the entry is not yet referenced in the
-                    # aggregated_entries dict
-                    if entry.hash not in aggregated_entries:
-                        # In that case, put it normally in the entries_for_date
-                        # list. It will get replaced by an AggregatedEntry
-                        # later if necessary
-                        entries_for_date.append(entry)
-                        aggregated_entries[entry.hash] = id
-                        id += 1
-                    else:
-                        # Get the first occurence of the entry in the
-                        # entries_for_date list
-                        existing_entry = entries_for_date[
-                            aggregated_entries[entry.hash]
-                        ]
-
-                        # The entry could already have been replaced by an
-                        # AggregatedEntry if there's more than 2 occurences
-                        if isinstance(existing_entry, Entry):
-                            # Create the AggregatedEntry, put the first
-                            # occurence of Entry in it and the current one
-                            aggregated_entry = AggregatedTimesheetEntry()
-                            aggregated_entry.entries.append(existing_entry)
-                            aggregated_entry.entries.append(entry)
-                            entries_for_date[
-                                aggregated_entries[entry.hash]
-                            ] = aggregated_entry
-                        else:
-                            # The entry we found is already an
-                            # AggregatedEntry, let's just append the
-                            # current entry to it
-                            aggregated_entry = existing_entry
-                            aggregated_entry.entries.append(entry)
-            else:
-                entries_for_date = [
-                    entry for entry in entries if entry_filter(entries_date, entry)
-                ]
+        return sorted(date_entries, key=lambda date_entry: date_entry[0])
 
-            if entries_for_date:
-                filtered_entries[entries_date].extend(entries_for_date)
+    def get_aliases_count(self):
+        """
+        Return a dict of {alias: number of entries} items of the aliases used in the collection.
+        """
+        return dict(
+            (alias, bin(alias_bitset).count('1'))
+            for alias, alias_bitset in six.iteritems(self.get_entries_index().aliases)
+        )
 
-        return filtered_entries
+    def get_dates(self, since=None, until=None):
+        """
+        Return the sorted list of the dates of the collection that are between `since` and `until` (both included). If
+        `since` or `until` are `None`, the range is open on that side. Only the matching dates are looked at, no matter
+        how many dates the collection contains.
+        """
+        # Dates added without going through `__setitem__` (eg. with `update`)
+        # are not indexed
+        if len(self._date_ordinals) != len(self):
+            self._date_ordinals = array.array('l', sorted(date.toordinal() for date in self))
+
+        start = bisect.bisect_left(self._date_ordinals, since.toordinal()) if since is not None else 0
+        end = (bisect.bisect_right(self._date_ordinals, until.toordinal()) if until is not None
+               else len(self._date_ordinals))
+
+        return [datetime.date.fromordinal(ordinal) for ordinal in self._date_ordinals[start:end]]
 
     def append_text(self, lines):
-        textlines = [TextLine(line) for line in lines]
-        self.lines += textlines
+        for line in lines:
+            self.block_list.append(TextLine(line))
 
 
 class EntriesList(list):
@@ -526,17 +1107,25 @@ class EntriesList(list):
 
     def __delitem__(self, key):
         """
-        Delete the given element from the list and synchronize the textual
-        representation.
+        Delete the given element (or slice of elements) from the list and
+        synchronize the textual representation.
         """
         if self.entries_collection is not None:
-            self.entries_collection.delete_entry(self[key])
+            entries = self[key] if isinstance(key, slice) else [self[key]]
+            self.entries_collection.delete_entries(entries)
+            self.entries_collection.unindex_entries(entries)
 
         super(EntriesList, self).__delitem__(key)
 
         if not self and self.entries_collection is not None:
             self.entries_collection.delete_date(self.date)
 
+    def __delslice__(self, i, j):
+        """
+        Python 2 compatibility.
+        """
+        self.__delitem__(slice(i, j))
+
     def append(self, x):
         """
         Append the given element to the list and synchronize the textual
@@ -546,6 +1135,14 @@ class EntriesList(list):
 
         if self.entries_collection is not None:
             self.entries_collection.add_entry(self.date, x)
+            self.entries_collection.index_entry(self.date, x)
+
+    def extend(self, iterable):
+        """
+        Append the elements of the given iterable to the list and synchronize the textual representation.
+        """
+        for x in iterable:
+            self.append(x)
 
 
 @six.python_2_unicode_compatible
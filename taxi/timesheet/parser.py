@@ -9,6 +9,35 @@ from .entry import Entry
 from .lines import DateLine, TextLine
 from .utils import is_top_down, trim
 
+TIME_REGEXP = re.compile(r'^\d{3,}$')
+
+
+def iter_stripped_lines(fileobj):
+    """
+    Yield the lines of the given file object without their line endings, leaving out the blank lines at the start and
+    at the end of the file, like ``text.strip().splitlines()`` would.
+    """
+    blank_lines = []
+    encountered_text = False
+
+    for file_line in fileobj:
+        for line in file_line.splitlines():
+            if not line.strip():
+                if encountered_text:
+                    blank_lines.append(line)
+                continue
+
+            if blank_lines:
+                for blank_line in blank_lines:
+                    yield blank_line
+                blank_lines = []
+
+            if not encountered_text:
+                line = line.lstrip()
+                encountered_text = True
+
+            yield line
+
 
 def create_time_from_text(text):
     """
@@ -17,7 +46,7 @@ def create_time_from_text(text):
     """
     text = text.replace(':', '')
 
-    if not re.match('^\d{3,}$', text):
+    if not TIME_REGEXP.match(text):
         raise ValueError("Time must be numeric")
 
     minutes = int(text[-2:])
@@ -44,6 +73,15 @@ class TimesheetParser(object):
     # Regular expressions to match date lines
     DATE_LINE_REGEXP = re.compile(r'(\d{1,2})\D(\d{1,2})\D(\d{4}|\d{2})')
     US_DATE_LINE_REGEXP = re.compile(r'(\d{4})\D(\d{1,2})\D(\d{1,2})')
+    # Regular expression used to classify a line in a single match. The alternatives are tried in order: text lines
+    # (blank or comment), dd/mm/yyyy dates, yyyy/mm/dd dates and finally entries. This needs to be "formatted" using
+    # the % notation with the patterns of the other regular expressions
+    LINE_REGEXP = (
+        r"(?:(?P<text_line>(?:#.*)?$)|"
+        r"(?P<date_line>%(date_line)s)|"
+        r"(?P<us_date_line>%(us_date_line)s)|"
+        r"(?P<entry_line>%(entry_line)s))"
+    )
 
     # Position of the different attributes in an entry line. An entry line is:
     # <0: flags><1: spacing1><2: alias><3: spacing2><4: duration><5: spacing3><6: description>
@@ -91,6 +129,16 @@ class TimesheetParser(object):
         self.add_date_to_bottom = add_date_to_bottom
         self.date_format = date_format
         self.entry_line_regexp = self.ENTRY_LINE_REGEXP % {'flags_repr': re.escape(''.join(self.flags_repr.values()))}
+        self.compiled_entry_line_regexp = re.compile(self.entry_line_regexp)
+        self.line_regexp = re.compile(self.LINE_REGEXP % {
+            'date_line': self.DATE_LINE_REGEXP.pattern,
+            'us_date_line': self.US_DATE_LINE_REGEXP.pattern,
+            'entry_line': self.entry_line_regexp,
+        })
+        # The groups of the date regular expressions are not named, so we need to know their position in the line
+        # regular expression to extract them
+        self._date_line_group = self.line_regexp.groupindex['date_line']
+        self._us_date_line_group = self.line_regexp.groupindex['us_date_line']
 
     def flags_to_text(self, flags):
         """
@@ -191,11 +239,18 @@ class TimesheetParser(object):
         Try to parse the given text line and extract and entry. Return an :class:`~taxi.timesheet.lines.Entry`
         object if parsing is successful, otherwise raise :exc:`~taxi.exceptions.ParseError`.
         """
-        split_line = re.match(self.entry_line_regexp, text)
+        split_line = self.compiled_entry_line_regexp.match(text)
 
         if not split_line:
             raise ParseError("Line must have an alias, a duration and a description")
 
+        return self.create_entry_line_from_match(split_line)
+
+    def create_entry_line_from_match(self, split_line):
+        """
+        Return an :class:`~taxi.timesheet.lines.Entry` object from the given match object of :attr:`entry_line_regexp`
+        (or :attr:`line_regexp`). Raise :exc:`~taxi.exceptions.ParseError` if the matched times are not valid.
+        """
         alias = split_line.group('alias')
         start_time = end_time = None
 
@@ -265,29 +320,37 @@ class TimesheetParser(object):
         object. If no date can be extracted from the given text, a :exc:`ValueError` will be raised.
         """
         # Try to match dd/mm/yyyy format
-        date_matches = re.match(self.DATE_LINE_REGEXP, text)
+        date_matches = self.DATE_LINE_REGEXP.match(text)
 
         # If no match, try with yyyy/mm/dd format
         if date_matches is None:
-            date_matches = re.match(self.US_DATE_LINE_REGEXP, text)
+            date_matches = self.US_DATE_LINE_REGEXP.match(text)
 
         if date_matches is None:
             raise ValueError("No date could be extracted from the given value")
 
+        return self.create_date_from_parts(*date_matches.group(1, 2, 3))
+
+    def create_date_from_parts(self, part1, part2, part3):
+        """
+        Return a :class:`datetime.date` object from the 3 textual parts of a date, either in the form
+        ``(dd, mm, yyyy)``, ``(dd, mm, yy)`` or ``(yyyy, mm, dd)``. :exc:`ValueError` will be raised if the parts don't
+        represent a valid date.
+        """
         # yyyy/mm/dd
-        if len(date_matches.group(1)) == 4:
-            return datetime.date(int(date_matches.group(1)), int(date_matches.group(2)), int(date_matches.group(3)))
+        if len(part1) == 4:
+            return datetime.date(int(part1), int(part2), int(part3))
 
         # dd/mm/yy
-        if len(date_matches.group(3)) == 2:
+        if len(part3) == 2:
             current_year = datetime.date.today().year
             current_millennium = current_year - (current_year % 1000)
-            year = current_millennium + int(date_matches.group(3))
+            year = current_millennium + int(part3)
         # dd/mm/yyyy
         else:
-            year = int(date_matches.group(3))
+            year = int(part3)
 
-        return datetime.date(year, int(date_matches.group(2)), int(date_matches.group(1)))
+        return datetime.date(year, int(part2), int(part1))
 
     def extract_flags_from_text(self, text):
         """
@@ -312,10 +375,23 @@ class TimesheetParser(object):
         """
         text = text.strip()
         lines = text.splitlines()
-        parsed_lines = []
-        encountered_date = False
 
-        for (lineno, line) in enumerate(lines, 1):
+        return self.parse_lines(lines)
+
+    def parse_lines(self, lines, first_line_number=1, encountered_date=False):
+        """
+        Parse the given list of text `lines` and return a list of line objects. See :meth:`parse_text`.
+        `first_line_number` is the number of the first line, used in errors, and `encountered_date` tells whether a
+        date line precedes the given lines.
+        """
+        return list(self.iter_parsed_lines(lines, first_line_number, encountered_date))
+
+    def iter_parsed_lines(self, lines, first_line_number=1, encountered_date=False):
+        """
+        Generator version of :meth:`parse_lines`: parse the text lines of the given `lines` iterable one by one and
+        yield the resulting line objects.
+        """
+        for (lineno, line) in enumerate(lines, first_line_number):
             try:
                 parsed_line = self.parse_line(line)
 
@@ -329,9 +405,67 @@ class TimesheetParser(object):
                 e.line = line
                 raise
             else:
-                parsed_lines.append(parsed_line)
+                yield parsed_line
 
-        return parsed_lines
+    def iter_lines(self, fileobj):
+        """
+        Streaming version of :meth:`parse_text`: parse the lines read from the given file object (or any iterable of
+        text lines) as they come and yield the resulting line objects, without ever holding the whole file in memory.
+        The yielded lines are the same as the ones that :meth:`parse_text` would return for the whole text.
+        """
+        return self.iter_parsed_lines(iter_stripped_lines(fileobj))
+
+    def reparse_text(self, text, lines):
+        """
+        Parse the given `text`, which is a new version of the given `lines` (a list of line objects, as returned by
+        :meth:`parse_text`), and return a list of line objects. Only the lines between the first and the last lines
+        that changed are parsed, the line objects of the unchanged lines at the start and at the end being reused.
+        """
+        text_lines = text.strip().splitlines()
+        max_unchanged_lines = min(len(text_lines), len(lines))
+
+        start = 0
+        while start < max_unchanged_lines and self.is_line_unchanged(lines[start], text_lines[start]):
+            start += 1
+
+        end = 0
+        while (end < max_unchanged_lines - start and
+               self.is_line_unchanged(lines[-end - 1], text_lines[-end - 1])):
+            end += 1
+
+        prefix_lines = lines[:start]
+        suffix_lines = lines[len(lines) - end:]
+        encountered_date = any(isinstance(line, DateLine) for line in prefix_lines)
+        changed_lines = self.parse_lines(
+            text_lines[start:len(text_lines) - end], first_line_number=start + 1, encountered_date=encountered_date
+        )
+        encountered_date = encountered_date or any(isinstance(line, DateLine) for line in changed_lines)
+
+        # The reused lines at the end could now be entries preceding any date
+        for (lineno, line) in enumerate(suffix_lines, len(text_lines) - end + 1):
+            if encountered_date or isinstance(line, DateLine):
+                break
+            elif isinstance(line, Entry):
+                raise ParseError(
+                    "Entries must be defined inside a date section", line=text_lines[lineno - 1], line_number=lineno
+                )
+
+        return prefix_lines + changed_lines + suffix_lines
+
+    def is_line_unchanged(self, line, text):
+        """
+        Return `True` if parsing the given `text` would result in the same line as the given `line` object, which can
+        then be reused.
+        """
+        # Lines that have been modified or created from scratch don't keep their original formatting, so they can't be
+        # reused safely
+        if isinstance(line, Entry):
+            if not line._text or line._changed_attrs & set(self.ENTRY_ATTRS_POSITION.values()):
+                return False
+        elif isinstance(line, DateLine) and line._text is None:
+            return False
+
+        return text.strip().replace('\t', ' ' * 4) == self.to_text(line)
 
     def parse_line(self, text):
         """
@@ -343,19 +477,30 @@ class TimesheetParser(object):
         """
         text = text.strip().replace('\t', ' ' * 4)
 
-        # The logic is: if the line starts with a #, consider it's a comment (TextLine), otherwise try to parse it as a
-        # date and if this fails, try to parse it as an entry. If this fails too, the line is not valid
-        if len(text) == 0 or text.startswith('#'):
-            parsed_line = TextLine(text)
-        else:
-            try:
-                date = self.create_date_from_text(text)
-            except ValueError:
-                parsed_line = self.create_entry_line_from_text(text)
-            else:
-                parsed_line = DateLine(date, text)
+        # The logic is: if the line is empty or starts with a #, consider it's a comment (TextLine), otherwise try to
+        # parse it as a date and if this fails, try to parse it as an entry. If this fails too, the line is not valid.
+        # All these cases are handled by a single match of `line_regexp`
+        line_matches = self.line_regexp.match(text)
+
+        if line_matches is None:
+            raise ParseError("Line must have an alias, a duration and a description")
+
+        line_type = line_matches.lastgroup
+
+        if line_type == 'text_line':
+            return TextLine(text)
+        elif line_type == 'entry_line':
+            return self.create_entry_line_from_match(line_matches)
+
+        date_group = self._date_line_group if line_type == 'date_line' else self._us_date_line_group
+
+        try:
+            date = self.create_date_from_parts(*line_matches.group(date_group + 1, date_group + 2, date_group + 3))
+        # The line looks like a date but is not a valid one (eg. 31.02.2014), so it can only be an entry
+        except ValueError:
+            return self.create_entry_line_from_text(text)
 
-        return parsed_line
+        return DateLine(date, text)
 
     def add_date(self, date, lines):
         """
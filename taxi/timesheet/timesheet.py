@@ -2,9 +2,7 @@ from __future__ import unicode_literals
 
 import codecs
 import datetime
-import os
-from collections import defaultdict
-from functools import reduce
+from collections import OrderedDict, defaultdict
 
 import six
 
@@ -12,7 +10,8 @@ from ..exceptions import NoActivityInProgressError, ParseError, StopInThePastErr
 from ..utils import file as file_utils
 from ..utils.date import months_ago
 from ..utils.structures import OrderedSet
-from .entry import EntriesCollection
+from .entry import EntriesCollection, Entry, iter_date_entries
+from .lines import DateLine
 from .parser import TimesheetParser
 
 
@@ -44,57 +43,141 @@ class Timesheet(object):
     def __init__(self, entries=None):
         self.entries = entries if entries is not None else EntriesCollection(TimesheetParser())
         self.file = None
+        self.file_path = None
+        # Contents of the file as they were when the timesheet was loaded or
+        # saved, used to avoid rewriting an unchanged file
+        self.file_contents = None
 
     def __str__(self):
         return '\n'.join(self.entries.to_lines())
 
     @classmethod
-    def load(cls, file_path, parser=None, initial=''):
+    def load(cls, file_path, parser=None, initial='', contents=None, cache=None):
         """
         Load the timesheet file located in `file_path`. If `parser` is not set,
         :class:`~taxi.timesheet.parser.TimesheetParser` will be used. If the file doesn't exist, an empty timesheet
         will be returned. If the file exists and its contents are not a valid timesheet,
-        :exc:`~taxi.timesheet.parser.ParseError` will be raised.
+        :exc:`~taxi.timesheet.parser.ParseError` will be raised. If `contents` is set, it will be used as the contents
+        of the file instead of reading it. If `cache` is set, it must be a
+        :class:`~taxi.timesheet.cache.TimesheetCache` object that will be used to avoid parsing the file if it didn't
+        change since it was last parsed.
         """
         if not parser:
             parser = TimesheetParser()
 
-        try:
-            with codecs.open(file_path, 'r', 'utf-8') as timesheet_file:
-                contents = timesheet_file.read()
-        except IOError:
-            if callable(initial):
-                contents = initial()
-            else:
-                contents = initial
+        file_exists = True
+
+        if contents is None:
+            try:
+                contents = cls.read_file(file_path)
+            except IOError:
+                file_exists = False
+
+                if callable(initial):
+                    contents = initial()
+                else:
+                    contents = initial
+
+        if cache is not None and file_exists:
+            lines = cache.get(file_path, contents, parser)
+
+            if lines is None:
+                lines = parser.parse_text(contents)
+                cache.set(file_path, contents, parser, lines)
 
-        entries = EntriesCollection(parser, contents)
+            entries = EntriesCollection(parser, lines=lines)
+        else:
+            entries = EntriesCollection(parser, contents)
 
         timesheet = cls(entries)
         timesheet.file_path = file_path
 
+        if file_exists:
+            timesheet.file_contents = contents
+
         return timesheet
 
+    def reload(self):
+        """
+        Reload the timesheet from its file. Only the lines that changed since the timesheet was loaded (or saved) are
+        parsed again, the other line objects are reused. If the file can't be read, the timesheet is left unchanged.
+        If the contents of the file are not a valid timesheet, :exc:`~taxi.timesheet.parser.ParseError` will be
+        raised.
+        """
+        try:
+            contents = self.read_file(self.file_path)
+        except IOError:
+            return
+
+        parser = self.entries.parser
+        self.entries = EntriesCollection(parser, lines=parser.reparse_text(contents, self.entries.lines))
+        self.file_contents = contents
+
+    @staticmethod
+    def iter_entries(file_path, parser=None):
+        """
+        Yield a `(date, entry)` tuple for each entry of the timesheet file located in `file_path`, parsing the file
+        while it's being read instead of loading it in memory. This is meant for read-only uses: the entries are not
+        bound to any timesheet. If the file doesn't exist, nothing is yielded. If the file contents are not a valid
+        timesheet, :exc:`~taxi.timesheet.parser.ParseError` will be raised.
+
+        Like in :class:`~taxi.timesheet.entry.EntriesCollection`, a date that appears several times in the file only
+        gets the entries of its last block. Since the last block of a date is only known once the whole file has been
+        read, the entries of a file are kept until it has been read, but not its other lines.
+        """
+        if not parser:
+            parser = TimesheetParser()
+
+        try:
+            timesheet_file = codecs.open(file_path, 'r', 'utf-8')
+        except IOError:
+            return
+
+        # {date: [date line, entries]} items of the last block of each date, in
+        # the order of these blocks
+        dates_blocks = OrderedDict()
+
+        with timesheet_file:
+            for line in parser.iter_lines(timesheet_file):
+                if isinstance(line, DateLine):
+                    dates_blocks.pop(line.date, None)
+                    current_block = dates_blocks[line.date] = [line]
+                elif isinstance(line, Entry):
+                    current_block.append(line)
+
+        for date_entry in iter_date_entries(line for block in six.itervalues(dates_blocks) for line in block):
+            yield date_entry
+
+    @staticmethod
+    def read_file(file_path):
+        """
+        Return the contents of the timesheet file located in `file_path`. Raise :exc:`IOError` if the file can't be
+        read.
+        """
+        with codecs.open(file_path, 'r', 'utf-8') as timesheet_file:
+            return timesheet_file.read()
+
     def save(self, file_path=None):
         """
         Save the contents of the timesheet to the given `file_path`. If `file_path` is not set, the timesheet will be
-        saved to the same file as it was loaded from.
+        saved to the same file as it was loaded from. The file is replaced atomically (see
+        :func:`taxi.utils.file.write_file_atomically`), and it's not written at all if the contents of the timesheet
+        are the same as the contents of the file when it was loaded or last saved.
         """
         file_path = file_path or self.file_path
 
         if not file_path:
             raise ValueError("save() needs a `file_path` parameter since the timesheet wasn't loaded from a file")
 
-        try:
-            open(file_path, 'r').close()
-        except IOError:
-            try:
-                os.makedirs(os.path.split(file_path)[0])
-            except OSError:
-                pass
+        contents = ''.join(line + '\n' for line in self.entries.to_lines())
+
+        if file_path == self.file_path and contents == self.file_contents:
+            return
+
+        file_utils.write_file_atomically(file_path, contents)
 
-        with codecs.open(file_path, 'w', 'utf-8') as timesheet_file:
-            timesheet_file.writelines([line + '\n' for line in self.entries.to_lines()])
+        if file_path == self.file_path:
+            self.file_contents = contents
 
     def get_hours(self, **kwargs):
         """
@@ -159,12 +242,7 @@ class Timesheet(object):
         Return a list of 2-tuples `(alias, usage_count)`, sorted by `usage_count` of aliases used in this timesheet.
         Only the top `limit` aliases are returned. If `limit` is left empty, all aliases are returned.
         """
-        aliases_count = defaultdict(int)
-
-        for entries_list in self.entries.values():
-            for entry in entries_list:
-                aliases_count[entry.alias] += 1
-
+        aliases_count = self.entries.get_aliases_count()
         sorted_aliases_count = sorted(aliases_count.items(), key=lambda item: item[1], reverse=True)
 
         if limit:
@@ -222,24 +300,32 @@ class TimesheetCollection:
         return call
 
     @classmethod
-    def load(cls, file_pattern, nb_previous_files=1, parser=None):
+    def load(cls, file_pattern, nb_previous_files=1, parser=None, nb_threads=1, cache=None):
         """
         Load a collection of timesheet from the given `file_pattern`. `file_pattern` is a path to a timesheet file that
         will be expanded with :func:`datetime.date.strftime` and the current date. `nb_previous_files` is the number of
         other timesheets to load, depending on `file_pattern` this will result in either the timesheet from the
         previous month or from the previous year to be loaded. If `parser` is not set, a default
-        :class:`taxi.timesheet.parser.TimesheetParser` will be used.
+        :class:`taxi.timesheet.parser.TimesheetParser` will be used. If `nb_threads` is greater than 1, the files will
+        be read concurrently by this number of threads before being parsed in order. `cache` is an optional
+        :class:`~taxi.timesheet.cache.TimesheetCache` object, see :meth:`Timesheet.load`.
         """
         if not parser:
             parser = TimesheetParser()
 
-        timesheet_files = cls.get_files(file_pattern, nb_previous_files)
+        timesheet_files = list(cls.get_files(file_pattern, nb_previous_files))
         timesheet_collection = cls()
 
-        for file_path in timesheet_files:
+        if nb_threads > 1 and len(timesheet_files) > 1:
+            timesheets_contents = cls.read_files(timesheet_files, nb_threads)
+        else:
+            timesheets_contents = [None] * len(timesheet_files)
+
+        for file_path, contents in zip(timesheet_files, timesheets_contents):
             try:
                 timesheet = Timesheet.load(
-                    file_path, parser=parser, initial=lambda: timesheet_collection.get_new_timesheets_contents()
+                    file_path, parser=parser, initial=lambda: timesheet_collection.get_new_timesheets_contents(),
+                    contents=contents, cache=cache
                 )
             except ParseError as e:
                 e.file = file_path
@@ -263,6 +349,56 @@ class TimesheetCollection:
 
         return timesheet_collection
 
+    def reload(self):
+        """
+        Reload all the timesheets of the collection. See :meth:`Timesheet.reload`.
+        """
+        for timesheet in self.timesheets:
+            try:
+                timesheet.reload()
+            except ParseError as e:
+                e.file = timesheet.file_path
+                raise
+
+    @classmethod
+    def iter_entries(cls, file_pattern, nb_previous_files=1, parser=None):
+        """
+        Yield a `(date, entry)` tuple for each entry of the timesheets matching `file_pattern`, reading the files one
+        after the other without loading them in memory. See :meth:`load` for the meaning of the parameters and
+        :meth:`Timesheet.iter_entries`.
+        """
+        for file_path in cls.get_files(file_pattern, nb_previous_files):
+            try:
+                for date_entry in Timesheet.iter_entries(file_path, parser):
+                    yield date_entry
+            except ParseError as e:
+                e.file = file_path
+                raise
+
+    @classmethod
+    def read_files(cls, files, nb_threads):
+        """
+        Read the given `files` concurrently using a pool of `nb_threads` threads and return their contents, in the same
+        order as `files`. The contents of files that can't be read are returned as `None`.
+        """
+        # The threads are only used for I/O. Parsing is still done sequentially since it requires the previous
+        # timesheets to be loaded (see `get_new_timesheets_contents`) and doesn't benefit from threads anyway
+        from multiprocessing.pool import ThreadPool
+
+        def read_file(file_path):
+            try:
+                return Timesheet.read_file(file_path)
+            except IOError:
+                return None
+
+        pool = ThreadPool(min(nb_threads, len(files)))
+
+        try:
+            return pool.map(read_file, files)
+        finally:
+            pool.close()
+            pool.join()
+
     @classmethod
     def get_files(cls, file_pattern, nb_previous_files, from_date=None):
         """
@@ -317,8 +453,9 @@ class TimesheetCollection:
         collection.
         """
         entries_list = self._timesheets_callback('entries')()
+        parser = entries_list[0].parser if entries_list else TimesheetParser()
 
-        return reduce(lambda x, y: x + y, entries_list)
+        return EntriesCollection.merge(parser, entries_list)
 
     def get_hours(self, **kwargs):
         """
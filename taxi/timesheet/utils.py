@@ -18,6 +18,13 @@ def is_top_down(lines):
         return date_lines[1].date > date_lines[0].date
 
 
+def is_empty_text_line(line):
+    """
+    Return `True` if the given `line` is a :class:`~taxi.timesheet.lines.TextLine` that doesn't have any text.
+    """
+    return hasattr(line, 'is_text_line') and line.is_text_line and not line.text.strip()
+
+
 def trim(lines):
     """
     Remove lines at the start and at the end of the given `lines` that are :class:`~taxi.timesheet.lines.TextLine`
@@ -28,13 +35,13 @@ def trim(lines):
     _lines = lines[:]
 
     for (lineno, line) in enumerate(_lines):
-        if hasattr(line, 'is_text_line') and line.is_text_line and not line.text.strip():
+        if is_empty_text_line(line):
             trim_top = lineno
         else:
             break
 
     for (lineno, line) in enumerate(reversed(_lines)):
-        if hasattr(line, 'is_text_line') and line.is_text_line and not line.text.strip():
+        if is_empty_text_line(line):
             trim_bottom = lineno
         else:
             break
@@ -154,7 +154,7 @@ class BaseUi(object):
             self.msg("The following unmapped alias has been added to your "
                      "configuration file: %s" % alias)
 
-    def _show_mapping(self, mapping, project, alias_first=True):
+    def _show_mapping(self, mapping, project, alias_first=True, is_active=None):
         (alias, mapping) = mapping
 
         # Handle local aliases
@@ -186,7 +186,10 @@ class BaseUi(object):
         args.append(' (%s)' % project_name if project_name else '')
         text = "[%s] %s -> %s%s" % tuple(args)
 
-        if project and project.is_active():
+        if is_active is None:
+            is_active = bool(project and project.is_active())
+
+        if is_active:
             self.msg(text)
         else:
             self.msg(click.style(text, fg='red'))
@@ -194,8 +197,8 @@ class BaseUi(object):
     def mapping_detail(self, mapping, project):
         self._show_mapping(mapping, project, False)
 
-    def alias_detail(self, mapping, project):
-        self._show_mapping(mapping, project, True)
+    def alias_detail(self, mapping, project, is_active=None):
+        self._show_mapping(mapping, project, True, is_active)
 
     def clean_inactive_aliases(self, aliases):
         self.msg("The following aliases are mapped to inactive projects:\n")
@@ -392,6 +395,10 @@ class BaseUi(object):
     def updating_projects_database(self):
         self.msg("Updating database, this may take some time...")
 
+    def projects_update_failed(self, backend_name, error):
+        self.warn("Couldn't fetch the projects of the backend `%s` (%s), its projects and shared aliases have been"
+                  " left untouched." % (backend_name, error))
+
     def projects_database_update_success(self, aliases_after_update,
                                          projects_db):
         """
@@ -409,10 +416,11 @@ class BaseUi(object):
             extracted from the aliases_after_update parameter, and the
             project/activity names are looked up in the projects db.
             """
-            for alias in aliases:
-                mapping = aliases_after_update[alias]
-                (project, activity) = projects_db.mapping_to_project(mapping)
+            resolved_mappings = projects_db.resolve_mappings(
+                (alias, aliases_after_update[alias]) for alias in aliases
+            )
 
+            for (alias, mapping, project, activity, is_active) in resolved_mappings:
                 self.msg("%s\n\t%s / %s" % (
                     alias, project.name if project else "?",
                     activity.name if activity else "?"
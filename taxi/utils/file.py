@@ -1,6 +1,9 @@
 from __future__ import unicode_literals
 
 import datetime
+import os
+import stat
+import tempfile
 
 
 def expand_date(filename, date=None):
@@ -8,3 +11,61 @@ def expand_date(filename, date=None):
         date = datetime.date.today()
 
     return date.strftime(filename)
+
+
+def get_file_mode(file_path):
+    """
+    Return the permissions of the file located in `file_path`, or the permissions a new file would get if it doesn't
+    exist.
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+
+        return 0o666 & ~umask
+
+
+def write_file_atomically(file_path, contents, mode=None):
+    """
+    Write the given text `contents` to `file_path`, encoded in UTF-8. The contents are first written to a temporary
+    file in the same directory and flushed to the disk, and the temporary file then replaces `file_path`, so that it's
+    never left half-written. The permissions of the existing file are kept, unless `mode` is given, in which case the
+    file gets these permissions. If `file_path` is a symbolic link, the file it points to is replaced.
+    """
+    file_path = os.path.realpath(file_path)
+    directory = os.path.dirname(file_path)
+
+    try:
+        os.makedirs(directory)
+    except OSError:
+        pass
+
+    if mode is None:
+        mode = get_file_mode(file_path)
+    fd, temp_file_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(file_path), suffix='.tmp')
+
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(contents.encode('utf-8'))
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        os.chmod(temp_file_path, mode)
+        # os.replace doesn't exist on Python 2, but os.rename is atomic too on POSIX systems
+        getattr(os, 'replace', os.rename)(temp_file_path, file_path)
+    except Exception:
+        os.remove(temp_file_path)
+        raise
+
+    # Make sure the rename itself is written to the disk
+    if hasattr(os, 'O_DIRECTORY'):
+        directory_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+
+        try:
+            os.fsync(directory_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(directory_fd)
@@ -42,6 +42,40 @@ class TestBackendEntryPoint(object):
         return self.TestBackend
 
 
+class BatchTestBackendEntryPoint(object):
+    """
+    Dedicated backend for tests that pushes entries in batches of 2. Entries
+    with the alias `batch_fail` will fail when trying to push them, and
+    batches containing an entry with the alias `batch_crash` will fail
+    without any message.
+    """
+    class BatchTestBackend(BaseBackend):
+        push_batch_size = 2
+
+        def __init__(self, *args, **kwargs):
+            super(BatchTestBackendEntryPoint.BatchTestBackend, self).__init__(
+                *args, **kwargs
+            )
+            self.batches = []
+
+        def push_entries(self, entries):
+            self.batches.append([entry for date, entry in entries])
+
+            if any(entry.alias == 'batch_crash' for date, entry in entries):
+                raise PushEntriesFailed()
+
+            failed_entries = {
+                entry: 'batch failed' for date, entry in entries
+                if entry.alias == 'batch_fail'
+            }
+
+            if failed_entries:
+                raise PushEntriesFailed(entries=failed_entries)
+
+    def load(self):
+        return self.BatchTestBackend
+
+
 class ConfigFile:
     DEFAULT_CONFIG = {
         'taxi': {
@@ -159,5 +193,8 @@ def set_test_backends(monkeypatch):
         'taxi.backends': {
             'test': TestBackendEntryPoint(),
             'dummy': TestBackendEntryPoint(),
+            'batch': BatchTestBackendEntryPoint(),
         }
     })
+    monkeypatch.setattr('taxi.plugins.plugins_registry._backends_uris', {})
+    monkeypatch.setattr('taxi.plugins.plugins_registry._backends_registry', {})
@@ -1,4 +1,10 @@
 import os
+import subprocess
+import sys
+
+import click
+
+from taxi.commands.base import AliasedCommand, AliasedGroup
 
 
 def test_run_without_config_file_creates_config_file(cli, config):
@@ -20,3 +26,32 @@ def test_wizard_constructs_correct_url_with_token(cli, config):
         config = f.read()
 
     assert 'dummy://token@timesheets.example.com' in config
+
+
+def test_startup_only_imports_invoked_commands():
+    # Shell prompts run taxi often, so make sure starting it doesn't import
+    # every command nor scan the installed plugins
+    loaded_modules = subprocess.check_output([
+        sys.executable, '-c',
+        'import sys; from taxi.commands.base import cli; print(" ".join(sorted(sys.modules)))'
+    ]).decode().split()
+
+    assert 'pkg_resources' not in loaded_modules
+    assert 'importlib.metadata' not in loaded_modules
+    assert [module for module in loaded_modules if module.startswith('taxi.commands.')] == [
+        'taxi.commands.base', 'taxi.commands.types'
+    ]
+
+
+def test_commands_are_loaded_when_invoked(cli):
+    assert 'Commits your work to the server.' in cli('ci', ['--help'])
+    assert 'Show a summary of your entries.' in cli('--help')
+
+
+def test_lazy_commands_get_their_declared_aliases():
+    group = AliasedGroup(lazy_commands={'foo': ('taxi.commands.foo', ['f', 'fo'])})
+    group.add_command(AliasedCommand('foo'))
+
+    with click.Context(group) as ctx:
+        assert group.get_command(ctx, 'f').name == 'foo'
+        assert group.get_command(ctx, 'foo').aliases == {'f', 'fo'}
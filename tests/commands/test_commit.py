@@ -1,10 +1,15 @@
 from __future__ import unicode_literals
 
 import datetime
+import threading
+import time
 
+import pytest
 from freezegun import freeze_time
 
-from taxi.timesheet import EntriesCollection, TimesheetParser
+from taxi.commands.commit import get_push_batch_size, push_entries
+from taxi.plugins import plugins_registry
+from taxi.timesheet import EntriesCollection, Entry, TimesheetParser
 
 from .assertions import line_in
 from .conftest import EntriesFileGenerator
@@ -275,3 +280,205 @@ fail  -1000 And a failing alias
     assert entries[0].pushed
     assert not entries[1].pushed
     assert entries[1].duration == (None, datetime.time(10))
+
+
+@freeze_time('2014-01-21')
+def test_commit_with_push_workers(cli, config, entries_file):
+    config.set('backends', 'test', 'test:///?push_workers=3')
+    entries_file.write("""21/01/2014
+alias_1 1 Play ping-pong
+fail 1 Play table football
+alias_1 1 Play table tennis
+alias_1 1 Repair coffee machine
+""")
+    stdout = cli('commit')
+
+    assert line_in("fail 1.00  Play table football - Failed", stdout)
+    assert 'Total pushed, test' in stdout
+    assert entries_file.read() == """21/01/2014
+= alias_1 1 Play ping-pong
+fail 1 Play table football
+= alias_1 1 Play table tennis
+= alias_1 1 Repair coffee machine
+"""
+
+
+@freeze_time('2014-01-21')
+def test_commit_to_multiple_backends(cli, config, entries_file):
+    config.set('local_aliases', '_internal', None)
+    entries_file.write("""21/01/2014
+alias_1 2 Play ping-pong
+_internal 1 Repair coffee machine
+post_push_fail 1 Play table football
+""")
+    stdout = cli('commit')
+
+    assert 'Total pushed, test' in stdout
+    assert 'Total pushed, local' in stdout
+    assert 'Failed entries\n\npost_push_fail' in stdout
+    assert entries_file.read() == """21/01/2014
+= alias_1 2 Play ping-pong
+= _internal 1 Repair coffee machine
+post_push_fail 1 Play table football
+"""
+
+
+@freeze_time('2014-01-21')
+def test_commit_pushes_entries_in_batches(cli, config, entries_file):
+    config.set('backends', 'batch', 'batch:///')
+    config.set('batch_aliases', 'batch_alias', '12/34')
+    config.set('batch_aliases', 'batch_fail', '12/35')
+    entries_file.write("""21/01/2014
+batch_alias 1 Play ping-pong
+batch_fail 1 Play table football
+batch_alias 1 Repair coffee machine
+""")
+    stdout = cli('commit')
+
+    assert [len(batch) for batch in plugins_registry.get_backend('batch').batches] == [2, 1]
+    assert line_in("batch_fail 1.00  Play table football - Failed, reason: batch failed", stdout)
+    assert entries_file.read() == """21/01/2014
+= batch_alias 1 Play ping-pong
+batch_fail 1 Play table football
+= batch_alias 1 Repair coffee machine
+"""
+
+
+@freeze_time('2014-01-21')
+def test_push_batch_size_option_is_ignored_without_push_entries(cli, config, entries_file):
+    config.set('backends', 'test', 'test:///?push_batch_size=2')
+    config.set('backends', 'batch', 'batch:///?push_batch_size=3')
+    entries_file.write("""21/01/2014
+alias_1 1 Play ping-pong
+fail 1 Play table football
+alias_1 1 Repair coffee machine
+""")
+    cli('commit')
+
+    assert get_push_batch_size(plugins_registry.get_backend('test')) == 1
+    assert get_push_batch_size(plugins_registry.get_backend('batch')) == 3
+
+    assert entries_file.read() == """21/01/2014
+= alias_1 1 Play ping-pong
+fail 1 Play table football
+= alias_1 1 Repair coffee machine
+"""
+
+
+@freeze_time('2014-01-21')
+def test_concurrent_push_failing_without_message_marks_entries_failed(cli, config, entries_file):
+    config.set('backends', 'batch', 'batch:///')
+    config.set('batch_aliases', 'batch_alias', '12/34')
+    config.set('batch_aliases', 'batch_crash', '12/35')
+    entries_file.write("""21/01/2014
+alias_1 2 Play ping-pong
+batch_alias 1 Play table football
+batch_crash 1 Repair coffee machine
+""")
+    stdout = cli('commit')
+
+    assert line_in("batch_alias 1.00  Play table football - Failed, reason: Couldn't push entries", stdout)
+    assert line_in("batch_crash 1.00  Repair coffee machine - Failed, reason: Couldn't push entries", stdout)
+    assert 'Total pushed, test' in stdout
+    assert entries_file.read() == """21/01/2014
+= alias_1 2 Play ping-pong
+batch_alias 1 Play table football
+batch_crash 1 Repair coffee machine
+"""
+
+
+def test_interrupted_push_keeps_results_of_finished_batches():
+    class ConcurrentBackend(object):
+        options = {'push_workers': '3'}
+
+        def __init__(self):
+            self.pushed_entries = []
+
+        def push_entries(self, entries):
+            self.pushed_entries.extend(entries)
+
+    backend = ConcurrentBackend()
+    entries = [(datetime.date(2014, 1, 21), Entry('alias_1', 1, 'Play ping-pong')) for i in range(3)]
+    interrupted_entries = []
+
+    def entry_pushed(backend, entry):
+        if interrupted_entries:
+            return
+
+        interrupted_entries.append(entry)
+
+        # Let the other batches finish so that their results are waiting to be
+        # processed when the push is interrupted
+        while len(backend.pushed_entries) < len(entries):
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        push_entries({backend: entries}, entry_pushed)
+
+    assert [entry.push_error for (entries_date, entry) in entries] == [None, None, None]
+
+
+def test_interrupted_push_doesnt_wait_for_running_batches():
+    class ConcurrentBackend(object):
+        options = {'push_workers': '2'}
+
+        def __init__(self):
+            self.started = threading.Event()
+            self.release = threading.Event()
+
+        def push_entries(self, entries):
+            if entries[0][1].alias == 'slow':
+                self.started.set()
+                self.release.wait(5)
+
+    backend = ConcurrentBackend()
+    entries = [
+        (datetime.date(2014, 1, 21), Entry('fast', 1, 'Play ping-pong')),
+        (datetime.date(2014, 1, 21), Entry('slow', 1, 'Play table football')),
+    ]
+
+    def entry_pushed(backend, entry):
+        backend.started.wait(5)
+
+        raise KeyboardInterrupt()
+
+    start = time.time()
+
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            push_entries({backend: entries}, entry_pushed)
+
+        assert time.time() - start < 1
+    finally:
+        backend.release.set()
+
+    assert entries[0][1].push_error is None
+    assert entries[1][1].push_error == "Interrupted, check status in backend"
+
+
+def test_backends_without_push_entries_get_entries_one_by_one():
+    class LegacyBackend(object):
+        options = {'push_batch_size': '3'}
+
+        def __init__(self):
+            self.pushed_entries = []
+
+        def push_entry(self, date, entry):
+            if entry.alias == 'fail':
+                raise Exception("Couldn't push entry")
+
+            self.pushed_entries.append(entry)
+
+    backend = LegacyBackend()
+    entries = [
+        (datetime.date(2014, 1, 21), Entry('alias_1', 1, 'Play ping-pong')),
+        (datetime.date(2014, 1, 21), Entry('fail', 1, 'Play table football')),
+    ]
+    push_entries({backend: entries}, lambda backend, entry: None)
+
+    assert get_push_batch_size(backend) == 1
+    assert backend.pushed_entries == [entries[0][1]]
+    assert [entry.push_error for (entries_date, entry) in entries] == [None, "Couldn't push entry"]
@@ -4,6 +4,8 @@ import datetime
 
 from freezegun import freeze_time
 
+from taxi.timesheet.parser import TimesheetParser
+
 from .assertions import line_in
 from .conftest import EntriesFileGenerator
 
@@ -184,3 +186,51 @@ alias_1 1 Visible entry
 
     assert 'Invisible entry' not in stdout
     assert 'Visible entry' in stdout
+
+
+def test_status_doesnt_load_backends(cli, config, entries_file):
+    # Loading this backend would fail since it's not registered
+    config.set('backends', 'not_installed', 'not_installed:///')
+    entries_file.write("20/01/2014\nalias_1 1 foobar")
+
+    stdout = cli('status')
+
+    assert 'foobar' in stdout
+
+
+@freeze_time('2014-01-21')
+def test_status_shows_entries_that_commit_pushes_when_date_is_repeated(cli, entries_file):
+    entries_file.write("""20/01/2014
+alias_1 2 Play ping-pong
+alias_1 1 Play table football
+
+21/01/2014
+alias_1 1 Repair coffee machine
+
+20/01/2014
+alias_1 1 Play table tennis
+""")
+    status_stdout = cli('status')
+    commit_stdout = cli('commit', args=['--yes'])
+
+    for description in ['Play table tennis', 'Repair coffee machine']:
+        assert description in status_stdout
+        assert description in commit_stdout
+
+    for description in ['Play ping-pong', 'Play table football']:
+        assert description not in status_stdout
+        assert description not in commit_stdout
+
+
+@freeze_time('2014-01-21')
+def test_status_uses_timesheets_cache(cli, entries_file, monkeypatch):
+    entries_file.write("20/01/2014\nalias_1 2 Play ping-pong\n")
+    cli('status')
+
+    def fail_parsing(*args, **kwargs):
+        raise AssertionError("The timesheet shouldn't be parsed")
+
+    monkeypatch.setattr(TimesheetParser, 'parse_text', fail_parsing)
+    monkeypatch.setattr(TimesheetParser, 'iter_lines', fail_parsing)
+
+    assert 'Play ping-pong' in cli('status')
@@ -1,4 +1,113 @@
+import time
+
+from taxi.projects import Activity, Project, ProjectsDb
+
+from . import conftest
+
+
 def test_update_doesnt_clean_local_aliases(cli, config):
     config.set('local_aliases', '_local1', '')
     stdout = cli('update')
     assert '_local1' not in stdout
+
+
+def get_projects(self):
+    if 'sleep' in self.options:
+        time.sleep(float(self.options['sleep']))
+
+    if 'fail' in self.options:
+        raise Exception("Backend unavailable")
+
+    project = Project(1, 'Project %s' % self.options.get('name', ''))
+    project.add_activity(Activity(2, 'Activity', 0))
+    project.aliases = {'shared_%s' % self.options.get('name', ''): 2}
+
+    return [project]
+
+
+def test_update_failed_backend_keeps_its_projects_and_aliases(cli, config, data_dir, monkeypatch):
+    monkeypatch.setattr(conftest.TestBackendEntryPoint.TestBackend, 'get_projects', get_projects, raising=False)
+    config.set('backends', 'test', 'test:///?name=test')
+    config.set('backends', 'local', 'dummy:///?name=local')
+    cli('update')
+
+    config.set('backends', 'test', 'test:///?name=test&fail=1')
+    stdout = cli('update')
+
+    assert "Couldn't fetch the projects of the backend `test` (Backend unavailable)" in stdout
+    assert ProjectsDb(str(data_dir)).get(1, 'test').name == 'Project test'
+    assert 'shared_test' in cli('alias', ['list'])
+    assert 'shared_local' in cli('alias', ['list'])
+
+
+def test_update_timeout(cli, config, monkeypatch):
+    monkeypatch.setattr(conftest.TestBackendEntryPoint.TestBackend, 'get_projects', get_projects, raising=False)
+    config.set('backends', 'test', 'test:///?name=test&sleep=1&update_timeout=0.1')
+    config.set('backends', 'local', 'dummy:///?name=local')
+    stdout = cli('update')
+
+    assert "Couldn't fetch the projects of the backend `test` (timed out after 0.1" in stdout
+    assert 'shared_local' in stdout
+
+
+def test_incremental_update(cli, config, data_dir, monkeypatch):
+    calls = []
+
+    def get_projects(self, since=None):
+        calls.append(since)
+
+        if since is None:
+            return [Project(1, 'Unchanged'), Project(2, 'Changed'), Project(3, 'Deleted')]
+
+        return [Project(2, 'Changed again'), Project(3, 'Deleted', Project.STATUS_DELETED), Project(4, 'New')]
+
+    monkeypatch.setattr(conftest.TestBackendEntryPoint.TestBackend, 'get_projects', get_projects, raising=False)
+    monkeypatch.setattr(
+        conftest.TestBackendEntryPoint.TestBackend, 'get_projects_sync_token', lambda self: 'token', raising=False
+    )
+    config.clear_section('backends')
+    config.set('backends', 'test', 'test:///')
+    cli('update')
+    cli('update')
+
+    assert calls == [None, 'token']
+    assert [project.name for project in ProjectsDb(str(data_dir)).get_projects()] == [
+        'Unchanged', 'Changed again', 'New'
+    ]
+
+
+def test_update_stores_shared_aliases_outside_config_file(cli, config, data_dir, monkeypatch):
+    monkeypatch.setattr(conftest.TestBackendEntryPoint.TestBackend, 'get_projects', get_projects, raising=False)
+    config.set('backends', 'test', 'test:///?name=test')
+    config.set('test_shared_aliases', 'legacy', '9/9')
+    config.set('backends', 'other', 'batch:///')
+    config.set('other_shared_aliases', 'legacy_other', '8/8')
+    cli('update')
+
+    with open(config.path) as config_file:
+        assert 'shared_aliases' not in config_file.read()
+
+    shared_aliases_file = data_dir.join('shared_aliases.json')
+    inode = shared_aliases_file.stat().ino
+    stdout = cli('alias', ['list'])
+
+    assert 'shared_test' in stdout
+    # The shared aliases of backends that don't have any are kept
+    assert 'legacy_other' in stdout
+    assert 'legacy ' not in stdout
+
+    cli('update')
+    assert shared_aliases_file.stat().ino == inode
+
+
+def test_update_migrates_unmapped_shared_aliases(cli, config, monkeypatch):
+    monkeypatch.setattr(conftest.TestBackendEntryPoint.TestBackend, 'get_projects', get_projects, raising=False)
+    config.set('backends', 'test', 'test:///?name=test')
+    config.set('backends', 'other', 'batch:///')
+    config.set('other_shared_aliases', 'legacy_unmapped', '')
+    cli('update')
+
+    with open(config.path) as config_file:
+        assert 'shared_aliases' not in config_file.read()
+
+    assert 'legacy_unmapped' in cli('alias', ['list'])
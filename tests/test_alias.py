@@ -1,6 +1,8 @@
 from __future__ import unicode_literals
 
-from taxi.aliases import AliasesDatabase, Mapping
+import difflib
+
+from taxi.aliases import AliasesDatabase, Mapping, SharedAliasesDb
 
 
 def test_alias_in():
@@ -142,3 +144,75 @@ def test_filter_from_alias():
         'foo': Mapping(mapping=(1, 2), backend='test'),
         'foobar': Mapping(mapping=(1, 3), backend='test'),
     }
+
+
+def test_get_close_matches_returns_the_same_matches_as_difflib():
+    aliases = ['foo', 'foobar', 'bar', 'baz', 'fobo', 'xyz', 'oof', 'foo_bar']
+    db = AliasesDatabase(dict((alias, Mapping(mapping=(1, 2), backend='test')) for alias in aliases))
+
+    for alias in ['fo', 'foob', 'ba', 'zzz', 'o_f']:
+        assert db.get_close_matches(alias) == difflib.get_close_matches(alias, aliases, cutoff=0.2)
+
+
+def test_get_close_matches_includes_added_aliases():
+    db = AliasesDatabase({'foo': Mapping(mapping=(1, 2), backend='test')})
+    assert db.get_close_matches('bar') == []
+
+    db['baz'] = Mapping(mapping=(1, 3), backend='test')
+    assert db.get_close_matches('bar') == ['baz']
+
+
+def test_filters_follow_updated_aliases():
+    db = AliasesDatabase({
+        'foo': Mapping(mapping=(1, 2), backend='test'),
+        'Bar': Mapping(mapping=(1, 3), backend='test'),
+        'baz': Mapping(mapping=(2, None), backend='other'),
+    })
+    db['foo'] = Mapping(mapping=(2, 3), backend='other')
+
+    assert list(db.filter_from_alias(None)) == ['Bar', 'baz', 'foo']
+    assert list(db.filter_from_alias('ba', backend='other')) == ['baz']
+    assert list(db.filter_from_mapping((1, None))) == ['Bar']
+    assert list(db.filter_from_mapping((2, None))) == ['baz', 'foo']
+    assert db.get_reversed_aliases()[Mapping(mapping=(2, 3), backend='other')] == 'foo'
+
+
+def test_filters_follow_bulk_updated_aliases():
+    db = AliasesDatabase({
+        'foo': Mapping(mapping=(1, 2), backend='test'),
+        'Bar': Mapping(mapping=(1, 3), backend='test'),
+    })
+    db.update({
+        'foo': Mapping(mapping=(2, 3), backend='other'),
+        'baz': Mapping(mapping=(2, None), backend='other'),
+        'abc': Mapping(mapping=(1, 4), backend='test'),
+    })
+
+    assert list(db.filter_from_alias(None)) == ['abc', 'Bar', 'baz', 'foo']
+    assert list(db.filter_from_alias(None, backend='test')) == ['abc', 'Bar']
+    assert list(db.filter_from_alias('ba', backend='other')) == ['baz']
+    assert list(db.filter_from_mapping((2, None))) == ['baz', 'foo']
+    assert db.get_close_matches('ab')[0] == 'abc'
+
+
+def test_shared_aliases_db_update_and_remove(tmpdir):
+    db = SharedAliasesDb(tmpdir.join('shared_aliases.json').strpath)
+    assert db.update({'test': {'foo': Mapping(mapping=(1, 2), backend='test')}})
+    assert not db.update({'test': {'foo': Mapping(mapping=(1, 2), backend='test')}})
+    db.update({'other': {'bar': Mapping(mapping=(3, 4), backend='other')}})
+    db.remove_aliases([('foo', Mapping(mapping=(1, 2), backend='test'))])
+
+    assert SharedAliasesDb(tmpdir.join('shared_aliases.json').strpath).get_aliases() == {
+        'test': {},
+        'other': {'bar': Mapping(mapping=(3, 4), backend='other')},
+    }
+
+
+def test_shared_aliases_db_unmapped_alias(tmpdir):
+    SharedAliasesDb(tmpdir.join('shared_aliases.json').strpath).update({
+        'test': {'foo': Mapping(mapping=None, backend='test')}
+    })
+
+    assert SharedAliasesDb(tmpdir.join('shared_aliases.json').strpath).get_aliases() == {
+        'test': {'foo': Mapping(mapping=None, backend='test')},
+    }
@@ -1,9 +1,11 @@
 from __future__ import unicode_literals
 
+import json
 import pickle
 import pytest
 
 from taxi import projects
+from taxi.aliases import Mapping
 
 
 def test_legacy_projects_db(tmpdir):
@@ -22,12 +24,130 @@ def test_legacy_projects_db(tmpdir):
 
 def test_outdated_projects_db(tmpdir):
     # Simulate a projects db version change
-    projects.LocalProjectsDb.VERSION = 1
+    version = projects.ProjectsDb.VERSION
+    projects.ProjectsDb.VERSION = version - 1
     try:
         p = projects.ProjectsDb(tmpdir.strpath)
         p.update([])
     finally:
-        projects.LocalProjectsDb.VERSION = 2
+        projects.ProjectsDb.VERSION = version
 
     with pytest.raises(projects.OutdatedProjectsDbException):
         p.get_projects()
+
+
+def test_sync_tokens_are_stored(tmpdir):
+    p = projects.ProjectsDb(tmpdir.strpath)
+    p.update([projects.Project(1, 'foo')], {'test': '2017-01-01'})
+
+    assert projects.ProjectsDb(tmpdir.strpath).get_sync_tokens() == {'test': '2017-01-01'}
+
+
+def test_outdated_legacy_projects_db(tmpdir):
+    projects_db_file = tmpdir.join(projects.ProjectsDb.PROJECTS_FILE)
+    projects_db_file.write(json.dumps({'VERSION': 1, 'projects': []}))
+
+    with pytest.raises(projects.OutdatedProjectsDbException):
+        projects.ProjectsDb(tmpdir.strpath).get_projects()
+
+
+def test_legacy_json_projects_db_is_migrated(tmpdir):
+    project = projects.Project(1, 'foo', projects.Project.STATUS_ACTIVE)
+    project.backend = 'test'
+    project.add_activity(projects.Activity(2, 'bar', 0))
+    projects_db_file = tmpdir.join(projects.ProjectsDb.PROJECTS_FILE)
+    projects_db_file.write(json.dumps(projects.LocalProjectsDb([project], {'test': 'token'}).get_dump_object()))
+
+    p = projects.ProjectsDb(tmpdir.strpath)
+
+    assert p.get(1, 'test').get_activity(2).name == 'bar'
+    assert p.get_sync_tokens() == {'test': 'token'}
+    assert not projects_db_file.check()
+
+
+def test_search_and_get_only_return_matching_projects(tmpdir):
+    p = projects.ProjectsDb(tmpdir.strpath)
+    p.update([
+        projects.Project(1, 'Taxi development'),
+        projects.Project(2, 'Taxi maintenance'),
+        projects.Project(3, 'Holidays'),
+    ])
+
+    assert [project.id for project in p.search(['taxi'])] == [1, 2]
+    assert [project.id for project in p.search(['taxi', 'DEV'])] == [1]
+    assert [project.id for project in p.search(['3'])] == [3]
+    assert [project.id for project in p.search(['a', 'ys'])] == [3]
+    assert p.search(['taxi', 'holidays']) == []
+    assert p.search(['\u00b2']) == []
+    assert p.get(2).name == 'Taxi maintenance'
+    assert p.get(4) is None
+
+
+def test_get_activity_finds_added_activities():
+    project = projects.Project(1, 'foo')
+    project.add_activity(projects.Activity(2, 'bar', 0))
+    assert project.get_activity(2).name == 'bar'
+
+    project.activities.append(projects.Activity(3, 'baz', 0))
+    assert project.get_activity(3).name == 'baz'
+    assert project.get_activity(4) is None
+
+
+def test_resolve_mappings_returns_projects_activities_and_status(tmpdir):
+    active_project = projects.Project(1, 'foo', projects.Project.STATUS_ACTIVE)
+    active_project.backend = 'test'
+    active_project.add_activity(projects.Activity(2, 'bar', 0))
+    inactive_project = projects.Project(3, 'baz', projects.Project.STATUS_FINISHED)
+    inactive_project.backend = 'test'
+
+    p = projects.ProjectsDb(tmpdir.strpath)
+    p.update([active_project, inactive_project])
+
+    resolved_mappings = p.resolve_mappings([
+        ('active', Mapping((1, 2), 'test')),
+        ('inexistent_activity', Mapping((1, 4), 'test')),
+        ('inactive', Mapping((3, None), 'test')),
+        ('other_backend', Mapping((1, 2), 'other')),
+        ('local', Mapping(None, 'test')),
+    ])
+
+    assert [
+        (r.alias, r.project.name if r.project else None, r.activity.name if r.activity else None, r.is_active)
+        for r in resolved_mappings
+    ] == [
+        ('active', 'foo', 'bar', True),
+        ('inexistent_activity', 'foo', None, True),
+        ('inactive', 'baz', None, False),
+        ('other_backend', None, None, False),
+        ('local', None, None, False),
+    ]
+
+
+def test_update_uses_unique_temporary_database(tmpdir):
+    # Simulate a temporary file left by a concurrent update
+    other_update_file = tmpdir.join(projects.ProjectsDb.PROJECTS_DB_FILE + '.tmp')
+    other_update_file.write('foo')
+
+    p = projects.ProjectsDb(tmpdir.strpath)
+    p.update([projects.Project(1, 'foo')])
+
+    assert other_update_file.read() == 'foo'
+    assert sorted(path.basename for path in tmpdir.listdir()) == [
+        projects.ProjectsDb.PROJECTS_DB_FILE, projects.ProjectsDb.PROJECTS_DB_FILE + '.tmp'
+    ]
+    assert [project.name for project in p.get_projects()] == ['foo']
+
+
+def test_backends_can_set_and_store_other_project_attributes(tmpdir):
+    project = projects.Project(1, 'foo')
+    project.backend = 'test'
+    project.customer = 'bar'
+    activity = projects.Activity(2, 'baz', 0)
+    activity.billable = True
+    project.add_activity(activity)
+
+    p = projects.ProjectsDb(tmpdir.strpath)
+    p.update([project])
+
+    assert p.get(1, 'test').customer == 'bar'
+    assert projects.dump_project(project)['activities'] == [{'id': 2, 'name': 'baz', 'price': 0, 'billable': True}]
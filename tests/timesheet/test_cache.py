@@ -0,0 +1,83 @@
+from __future__ import unicode_literals
+
+import datetime
+import os
+
+from taxi.timesheet import Entry, Timesheet, TimesheetCache, TimesheetParser
+
+
+def test_cached_timesheet_has_same_lines(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("""# Comment
+20.01.2014
+= _internal 0800-0900 Fix coffee machine
+taxi   -1000 Work a bit
+
+2014/01/21
+? taxi 1.5 Work a bit more""")
+    cache = TimesheetCache(str(tmpdir.join('cache')))
+
+    Timesheet.load(str(timesheet_file), cache=cache)
+    lines = cache.get(str(timesheet_file), timesheet_file.read(), TimesheetParser())
+    timesheet = Timesheet.load(str(timesheet_file), cache=cache)
+    entries = timesheet.entries[datetime.date(2014, 1, 20)]
+
+    assert lines is not None
+    assert timesheet.entries.to_lines() == timesheet_file.read().splitlines()
+    assert entries[0].pushed and entries[0].duration == (datetime.time(8), datetime.time(9))
+    assert entries[1].hours == 1
+    assert timesheet.entries[datetime.date(2014, 1, 21)][0].ignored
+
+
+def test_cache_is_invalidated_when_file_changes(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("20.01.2014\ntaxi 2 Work a bit")
+    cache = TimesheetCache(str(tmpdir.join('cache')))
+
+    Timesheet.load(str(timesheet_file), cache=cache)
+    timesheet_file.write("20.01.2014\ntaxi 3 Work a bit")
+
+    assert cache.get(str(timesheet_file), timesheet_file.read(), TimesheetParser()) is None
+    assert Timesheet.load(str(timesheet_file), cache=cache).entries[datetime.date(2014, 1, 20)][0].duration == 3
+
+
+def test_cache_is_invalidated_when_flags_change(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("20.01.2014\n! taxi 2 Work a bit")
+    cache = TimesheetCache(str(tmpdir.join('cache')))
+    parser = TimesheetParser(flags_repr={Entry.FLAG_IGNORED: '!', Entry.FLAG_PUSHED: '='})
+
+    Timesheet.load(str(timesheet_file), parser=parser, cache=cache)
+
+    assert cache.get(str(timesheet_file), timesheet_file.read(), TimesheetParser()) is None
+
+
+def test_cache_files_of_removed_timesheets_are_pruned(tmpdir):
+    cache = TimesheetCache(str(tmpdir.join('cache')))
+
+    for name in ['2014_01.tks', '2014_02.tks']:
+        tmpdir.join(name).write("20.01.2014\ntaxi 2 Work a bit")
+        Timesheet.load(str(tmpdir.join(name)), cache=cache)
+
+    tmpdir.join('2014_01.tks').remove()
+    tmpdir.join('2014_03.tks').write("20.03.2014\ntaxi 2 Work a bit")
+    Timesheet.load(str(tmpdir.join('2014_03.tks')), cache=cache)
+
+    assert sorted(path.basename for path in tmpdir.join('cache').listdir()) == sorted(
+        os.path.basename(cache.get_cache_file_path(str(tmpdir.join(name)))) for name in ['2014_02.tks', '2014_03.tks']
+    )
+
+
+def test_cache_files_are_only_readable_by_owner(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("20.01.2014\ntaxi 2 Work a bit")
+    timesheet_file.chmod(0o600)
+    cache = TimesheetCache(str(tmpdir.join('cache')))
+    old_umask = os.umask(0o022)
+
+    try:
+        Timesheet.load(str(timesheet_file), cache=cache)
+    finally:
+        os.umask(old_umask)
+
+    assert os.stat(cache.get_cache_file_path(str(timesheet_file))).st_mode & 0o777 == 0o600
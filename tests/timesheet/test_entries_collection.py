@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 import datetime
 
 from taxi.timesheet import EntriesCollection, Entry, TimesheetParser
+from taxi.timesheet.entry import EntriesList
 
 
 def test_entries_collection_from_string():
@@ -131,3 +132,151 @@ _internal 0800-0900 Fix coffee machine""")
     assert entries_collection.parser.to_text(entries_collection.lines[0]) == "21.01.2014"
     assert entries_collection.parser.to_text(entries_collection.lines[1]) == ""
     assert entries_collection.lines[2] == entry_line
+
+
+def test_add_entry_to_date_in_the_middle():
+    entries_collection = EntriesCollection(TimesheetParser(), """20.01.2014
+_internal 0800-0900 Fix coffee machine
+
+21.01.2014
+# Meetings
+_internal 0900-1000 Fix printer
+
+22.01.2014
+taxi 2 Work a bit""")
+    entries_collection[datetime.date(2014, 1, 21)].append(Entry('taxi', 4, 'Work a bit more'))
+
+    assert entries_collection.to_lines()[3:8] == [
+        "21.01.2014", "# Meetings", "_internal 0900-1000 Fix printer", "taxi 4 Work a bit more", ""
+    ]
+
+
+def test_remove_date_in_the_middle_keeps_text_lines():
+    entries_collection = EntriesCollection(TimesheetParser(), """20.01.2014
+_internal 0800-0900 Fix coffee machine
+
+21.01.2014
+# Meetings
+_internal 0900-1000 Fix printer
+
+22.01.2014
+taxi 2 Work a bit""")
+    del entries_collection[datetime.date(2014, 1, 21)]
+    entries_collection[datetime.date(2014, 1, 20)].append(Entry('taxi', 4, 'Work a bit more'))
+
+    assert entries_collection.to_lines() == [
+        "20.01.2014", "_internal 0800-0900 Fix coffee machine", "taxi 4 Work a bit more", "", "# Meetings", "",
+        "22.01.2014", "taxi 2 Work a bit"
+    ]
+
+
+def test_remove_entries_slice_removes_lines():
+    entries_collection = EntriesCollection(
+        TimesheetParser(), "20.01.2014\n_internal 0800-0900 Fix coffee machine\ntaxi 2 Work a bit\ntaxi 1 Work more"
+    )
+    entries_date = datetime.date(2014, 1, 20)
+    del entries_collection[entries_date][:2]
+
+    assert len(entries_collection[entries_date]) == 1
+    assert entries_collection.to_lines() == ["20.01.2014", "taxi 1 Work more"]
+
+
+def test_delete_entries_removes_lines():
+    entries_collection = EntriesCollection(TimesheetParser(), """20.01.2014
+_internal 0800-0900 Fix coffee machine
+taxi 2 Work a bit
+
+21.01.2014
+_internal 0800-0900 Fix printer""")
+    entries_collection.delete_entries([
+        entries_collection[datetime.date(2014, 1, 20)][1], entries_collection[datetime.date(2014, 1, 21)][0]
+    ])
+
+    assert entries_collection.to_lines() == ["20.01.2014", "_internal 0800-0900 Fix coffee machine", "", "21.01.2014"]
+
+
+def test_delete_dates_entries_removes_lines():
+    entries_collection = EntriesCollection(TimesheetParser(), """20.01.2014
+_internal 0800-0900 Fix coffee machine
+
+21.01.2014
+_internal 0800-0900 Fix printer
+
+22.01.2014
+taxi 2 Work a bit""")
+    entries_collection.delete_dates_entries([datetime.date(2014, 1, 20), datetime.date(2014, 1, 22)])
+
+    assert list(entries_collection.keys()) == [datetime.date(2014, 1, 21)]
+    assert entries_collection.to_lines() == ["21.01.2014", "_internal 0800-0900 Fix printer"]
+
+
+def test_delete_dates_entries_ignores_repeated_dates():
+    entries_collection = EntriesCollection(TimesheetParser(), """20.01.2014
+_internal 0800-0900 Fix coffee machine
+
+21.01.2014
+_internal 0800-0900 Fix printer""")
+    entries_collection.delete_dates_entries([datetime.date(2014, 1, 20), datetime.date(2014, 1, 20)])
+
+    assert list(entries_collection.keys()) == [datetime.date(2014, 1, 21)]
+    assert entries_collection.to_lines() == ["21.01.2014", "_internal 0800-0900 Fix printer"]
+
+
+def test_merge_entries_collections():
+    parser = TimesheetParser()
+    entries_collection_1 = EntriesCollection(parser, "20.01.2014\n_internal 0800-0900 Fix coffee machine")
+    entries_collection_2 = EntriesCollection(parser, "20.01.2014\ntaxi 2 Work a bit\n21.01.2014\ntaxi 1 Work more")
+    merged_collection = EntriesCollection.merge(parser, [entries_collection_1, entries_collection_2])
+
+    assert [entry.alias for entry in merged_collection[datetime.date(2014, 1, 20)]] == ['_internal', 'taxi']
+    assert len(merged_collection[datetime.date(2014, 1, 21)]) == 1
+    assert merged_collection.lines == []
+    assert entries_collection_1.to_lines() == ["20.01.2014", "_internal 0800-0900 Fix coffee machine"]
+
+
+def test_filter_date_range_uses_current_dates():
+    entries_collection = EntriesCollection(TimesheetParser(), """01.01.2014
+foo 2 bar
+
+05.01.2014
+foo 1 bar
+
+03.01.2014
+foo 1 bar
+
+10.01.2014
+foo 1 bar""")
+    del entries_collection[datetime.date(2014, 1, 3)]
+    entries_collection[datetime.date(2014, 1, 4)].append(Entry('foo', 1, 'baz'))
+
+    assert entries_collection.get_dates(datetime.date(2014, 1, 2), datetime.date(2014, 1, 5)) == [
+        datetime.date(2014, 1, 4), datetime.date(2014, 1, 5)
+    ]
+    assert list(entries_collection.filter(date=(None, datetime.date(2014, 1, 4)))) == [
+        datetime.date(2014, 1, 1), datetime.date(2014, 1, 4)
+    ]
+    assert list(entries_collection.filter(date=datetime.date(2014, 1, 10))) == [datetime.date(2014, 1, 10)]
+
+
+def test_delete_date_added_with_update():
+    entries_collection = EntriesCollection(TimesheetParser(), """05.01.2014
+foo 1 bar
+
+10.01.2014
+foo 1 bar""")
+    entries_collection.update({
+        datetime.date(2014, 1, 1): EntriesList(entries_collection, datetime.date(2014, 1, 1)),
+        datetime.date(2014, 1, 20): EntriesList(entries_collection, datetime.date(2014, 1, 20)),
+    })
+    del entries_collection[datetime.date(2014, 1, 1)]
+    del entries_collection[datetime.date(2014, 1, 20)]
+
+    assert entries_collection.get_dates() == [datetime.date(2014, 1, 5), datetime.date(2014, 1, 10)]
+
+
+def test_delete_date_added_with_update_in_empty_collection():
+    entries_collection = EntriesCollection(TimesheetParser())
+    entries_collection.update({datetime.date(2014, 1, 1): EntriesList(entries_collection, datetime.date(2014, 1, 1))})
+    del entries_collection[datetime.date(2014, 1, 1)]
+
+    assert entries_collection.get_dates() == []
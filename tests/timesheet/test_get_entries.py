@@ -1,4 +1,6 @@
-from taxi.timesheet import EntriesCollection, Timesheet
+import datetime
+
+from taxi.timesheet import EntriesCollection, Entry, Timesheet
 from taxi.timesheet.parser import TimesheetParser
 from . import create_timesheet
 
@@ -37,3 +39,38 @@ foo 1 bar"""
     timesheet_entries = timesheet.entries.filter(pushed=False)
 
     assert len(list(timesheet_entries.values())[0]) == 2
+
+
+def test_get_entries_filters_follow_changes_to_entries():
+    contents = """01.04.2013
+foo 2 bar
+= bar 0900-1000 bar
+baz 1 bar
+
+02.04.2013
+foo 0 bar"""
+    t = create_timesheet(contents)
+    entries = t.entries
+
+    assert [entry.alias for entry in entries.filter(pushed=False, ignored=False, unmapped=False)[
+        datetime.date(2013, 4, 1)]] == ['foo']
+
+    entries[datetime.date(2013, 4, 1)][0].pushed = True
+    entries[datetime.date(2013, 4, 1)][2].alias = 'bar'
+    entries[datetime.date(2013, 4, 2)][0].duration = 1
+    entries[datetime.date(2013, 4, 3)].append(Entry('foo', 2, 'bar'))
+    del entries[datetime.date(2013, 4, 1)][1]
+
+    filtered_entries = entries.filter(pushed=False, ignored=False, unmapped=False)
+
+    assert sorted(filtered_entries) == [datetime.date(2013, 4, 1), datetime.date(2013, 4, 2), datetime.date(2013, 4, 3)]
+    assert [entry.alias for entry in filtered_entries[datetime.date(2013, 4, 1)]] == ['bar']
+    assert list(entries.filter(pushed=True)) == [datetime.date(2013, 4, 1)]
+
+
+def test_get_popular_aliases_counts_entries_by_alias():
+    t = create_timesheet("01.04.2013\nfoo 2 bar\nbar 1 bar\nfoo 1 bar")
+    t.entries[datetime.date(2013, 4, 1)][1].alias = 'foo'
+    t.entries[datetime.date(2013, 4, 2)].append(Entry('baz', 1, 'bar'))
+
+    assert t.get_popular_aliases() == [('foo', 3), ('baz', 1)]
@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 
 import datetime
+import io
 
 import pytest
 
@@ -321,3 +322,69 @@ alias_1 0845-0960 xxx
 
     with pytest.raises(ParseError):
         TimesheetParser().parse_text(contents)
+
+
+def test_parse_line_comment():
+    line = TimesheetParser().parse_line('  # 01.01.2014 foo 2 bar')
+
+    assert isinstance(line, TextLine)
+    assert line.text == '# 01.01.2014 foo 2 bar'
+
+
+def test_parse_line_us_date():
+    line = TimesheetParser().parse_line('2013/08/09')
+
+    assert isinstance(line, DateLine)
+    assert line.date == datetime.date(2013, 8, 9)
+
+
+def test_parse_line_invalid_date_is_parsed_as_entry():
+    with pytest.raises(ParseError):
+        TimesheetParser().parse_line('31.02.2014')
+
+
+def test_reparse_text_reuses_unchanged_lines():
+    parser = TimesheetParser()
+    lines = parser.parse_text("20.01.2014\nfoo 2 bar\nbar 1 baz\n\n21.01.2014\nfoo 1 baz")
+    new_lines = parser.reparse_text("20.01.2014\nfoo 2 bar\nbar 3 baz\n\n21.01.2014\nfoo 1 baz", lines)
+
+    assert [parser.to_text(line) for line in new_lines] == [
+        "20.01.2014", "foo 2 bar", "bar 3 baz", "", "21.01.2014", "foo 1 baz"
+    ]
+    assert [new_line is line for new_line, line in zip(new_lines, lines)] == [True, True, False, True, True, True]
+
+
+def test_reparse_text_doesnt_reuse_modified_entries():
+    parser = TimesheetParser()
+    lines = parser.parse_text("20.01.2014\nfoo 2 bar")
+    lines[1].pushed = True
+    new_lines = parser.reparse_text("20.01.2014\n= foo 2 bar", lines)
+
+    assert new_lines[1] is not lines[1]
+    assert new_lines[1].pushed
+
+
+def test_reparse_text_checks_entries_are_inside_date():
+    parser = TimesheetParser()
+    lines = parser.parse_text("20.01.2014\nfoo 2 bar")
+
+    with pytest.raises(ParseError) as e:
+        parser.reparse_text("# 20.01.2014\nfoo 2 bar", lines)
+
+    assert e.value.line_number == 2
+
+
+def test_iter_lines_returns_same_lines_as_parse_text():
+    parser = TimesheetParser()
+    text = "\n\n# timesheet\n20.01.2014\nfoo 2 bar\n\n\n21.01.2014\nfoo 1 baz\n\n"
+    lines = parser.iter_lines(io.StringIO(text))
+
+    assert not isinstance(lines, list)
+    assert [parser.to_text(line) for line in lines] == [parser.to_text(line) for line in parser.parse_text(text)]
+
+
+def test_iter_lines_error_has_line_number():
+    with pytest.raises(ParseError) as e:
+        list(TimesheetParser().iter_lines(io.StringIO("\n# timesheet\nfoo 2 bar")))
+
+    assert e.value.line_number == 2
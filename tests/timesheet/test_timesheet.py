@@ -5,7 +5,7 @@ import datetime
 
 from freezegun import freeze_time
 
-from taxi.timesheet import EntriesCollection, Entry, Timesheet, TimesheetParser
+from taxi.timesheet import EntriesCollection, Entry, Timesheet, TimesheetCollection, TimesheetParser
 
 from . import create_timesheet
 
@@ -114,3 +114,100 @@ alias_1       -1000 xxx
 
     assert continuation_entry.duration == (None, datetime.time(10))
     assert continuation_entry.hours == 0.5
+
+
+@freeze_time('2014-03-10')
+def test_load_timesheets_with_threads(tmpdir):
+    tmpdir.join('2014_01.tks').write("02.01.2014\nfoo 2 january\n\n01.01.2014\nfoo 2 new year")
+    tmpdir.join('2014_02.tks').write("01.02.2014\nfoo 2 february")
+
+    timesheet_collection = TimesheetCollection.load(str(tmpdir.join('%Y_%m.tks')), 2, nb_threads=3)
+    descriptions = [
+        [entry.description for entries in timesheet.entries.values() for entry in entries]
+        for timesheet in timesheet_collection
+    ]
+
+    assert descriptions == [['january', 'new year'], ['february'], []]
+    assert timesheet_collection.latest().entries.parser.add_date_to_bottom is False
+
+
+def test_reload_timesheet(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("20.01.2014\nfoo 0900-1000 bar\nfoo -1100 baz")
+    timesheet = Timesheet.load(str(timesheet_file))
+    entries = timesheet.entries[datetime.date(2014, 1, 20)]
+
+    timesheet_file.write("20.01.2014\nfoo 0900-1000 bar\nfoo -1130 baz")
+    timesheet.reload()
+    reloaded_entries = timesheet.entries[datetime.date(2014, 1, 20)]
+
+    assert reloaded_entries[0] is entries[0]
+    assert reloaded_entries[1].hours == 1.5
+
+
+@freeze_time('2014-03-10')
+def test_iter_timesheets_entries(tmpdir):
+    tmpdir.join('2014_02.tks').write("01.02.2014\nfoo 0900-1000 february\nbar -1100 continued")
+    tmpdir.join('2014_03.tks').write("01.03.2014\nfoo 2 march")
+
+    entries = [
+        (date, entry.description, entry.hours)
+        for date, entry in TimesheetCollection.iter_entries(str(tmpdir.join('%Y_%m.tks')), 2)
+    ]
+
+    assert entries == [
+        (datetime.date(2014, 2, 1), 'february', 1),
+        (datetime.date(2014, 2, 1), 'continued', 1),
+        (datetime.date(2014, 3, 1), 'march', 2),
+    ]
+
+
+def test_iter_timesheet_entries_keeps_last_block_of_repeated_date(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("20.01.2014\nfoo 2 a\nbar 1 b\n\n21.01.2014\nfoo 1 c\n\n20.01.2014\nfoo 1 d")
+
+    entries = [(date, entry.description) for date, entry in Timesheet.iter_entries(str(timesheet_file))]
+    loaded_entries = Timesheet.load(str(timesheet_file)).entries
+
+    assert entries == [(datetime.date(2014, 1, 21), 'c'), (datetime.date(2014, 1, 20), 'd')]
+    assert sorted(entries) == sorted(
+        (date, entry.description) for date, date_entries in loaded_entries.items() for entry in date_entries
+    )
+
+
+def test_save_unchanged_timesheet_doesnt_write_file(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("20.01.2014\nfoo 2 bar\n")
+    timesheet_file.setmtime(0)
+
+    Timesheet.load(str(timesheet_file)).save()
+
+    assert timesheet_file.mtime() == 0
+
+
+def test_save_replaces_file_and_keeps_permissions(tmpdir):
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.write("20.01.2014\nfoo 2 bar\n")
+    timesheet_file.chmod(0o640)
+
+    timesheet = Timesheet.load(str(timesheet_file))
+    timesheet.entries[datetime.date(2014, 1, 20)][0].pushed = True
+    timesheet.save()
+
+    assert timesheet_file.read() == "20.01.2014\n= foo 2 bar\n"
+    assert timesheet_file.stat().mode & 0o777 == 0o640
+    assert tmpdir.listdir() == [timesheet_file]
+
+
+def test_save_through_symlink_replaces_target(tmpdir):
+    target_file = tmpdir.join('target.tks')
+    target_file.write("20.01.2014\nfoo 2 bar\n")
+    timesheet_file = tmpdir.join('timesheet.tks')
+    timesheet_file.mksymlinkto(target_file)
+
+    timesheet = Timesheet.load(str(timesheet_file))
+    timesheet.entries[datetime.date(2014, 1, 20)][0].pushed = True
+    timesheet.save()
+
+    assert timesheet_file.islink()
+    assert target_file.read() == "20.01.2014\n= foo 2 bar\n"